@@ -0,0 +1,88 @@
+"""
+Import-time benchmark, guarding the cold start of short-lived scripts.
+
+Imports each module in a fresh interpreter several times, reports the median
+import time and fails if it exceeds a budget or if heavy optional dependencies
+(plotting, imaging, vendor SDKs) were imported along the way.
+
+    python benchmarks/import_time.py --max_ms 500
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+MODULES = ["slm_controller.slm", "slm_controller.utils", "slm_controller.hardware"]
+
+# modules that must only be imported when actually used
+LAZY = [
+    "asyncio",
+    "matplotlib",
+    "PIL",
+    "holoeye",
+    "board",
+    "adafruit_rgb_display",
+    "adafruit_pcd8544",
+]
+
+_SCRIPT = """
+import sys, time
+t = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t
+print(elapsed)
+print(",".join(m for m in {lazy!r} if m in sys.modules))
+"""
+
+
+def measure(module, repeat):
+    """
+    Import `module` in `repeat` fresh interpreters.
+
+    Returns
+    -------
+    times : list(float)
+        Import times [s].
+    eager : set(str)
+        Modules of `LAZY` that got imported.
+    """
+    times, eager = [], set()
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", _SCRIPT.format(module=module, lazy=LAZY)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.splitlines()
+        times.append(float(out[0]))
+        eager.update(m for m in out[1].split(",") if m)
+    return times, eager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh imports per module.")
+    parser.add_argument(
+        "--max_ms", type=float, default=None, help="Fail if a median import time exceeds this."
+    )
+    args = parser.parse_args()
+
+    failed = False
+    for module in MODULES:
+        times, eager = measure(module, args.repeat)
+        median_ms = 1e3 * statistics.median(times)
+        print(f"{module:<28} {median_ms:8.1f} ms")
+
+        if eager:
+            print(f"  imported eagerly: {', '.join(sorted(eager))}")
+            failed = True
+        if args.max_ms is not None and median_ms > args.max_ms:
+            print(f"  exceeds budget of {args.max_ms:.1f} ms")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -53,6 +53,9 @@ def main(file_path, monochrome, not_original_ratio, show_preview):
     # display
     s.imshow(image)
 
+    # keep the preview open until its window is closed
+    s.wait_preview()
+
 
 if __name__ == "__main__":
     main()
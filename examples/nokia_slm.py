@@ -50,6 +50,9 @@ def main(file_path, not_original_ratio, show_preview):
     # display
     s.imshow(image)
 
+    # keep the preview open until its window is closed
+    s.wait_preview()
+
 
 if __name__ == "__main__":
     main()
@@ -4,5 +4,6 @@
 
 black -l 100 *.py
 black -l 100 examples/*.py
+black -l 100 benchmarks/*.py
 black -l 100 slm_controller/*.py
 black -l 100 slm_controller/**/*.py
@@ -27,4 +27,10 @@ setuptools.setup(
         "matplotlib",
     ],
     extra_requires={"dev": ["click", "black"],},
+    entry_points={
+        "console_scripts": [
+            "slm-bench=slm_controller.bench:main",
+            "slm-server=slm_controller.server:main",
+        ]
+    },
 )
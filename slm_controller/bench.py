@@ -0,0 +1,454 @@
+"""
+Benchmark of the frame rate, latency and jitter a device achieves.
+
+Synthetic mask streams are pushed through any device of `slm.create`, real or
+simulated, and every `imshow` call is timed:
+
+- throughput: masks shown per second,
+- latency: duration of each `imshow` call, i.e. until the mask is on the
+  device, as percentiles,
+- jitter: spread of the intervals between consecutive masks, as percentiles
+  and a histogram.
+
+Results can be saved as a JSON baseline and compared with a later run, so that
+regressions show up between releases.
+
+    slm-bench nokia --simulate --content random sparse --save nokia.json
+    slm-bench nokia --simulate --compare nokia.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+
+from slm_controller import playback
+from slm_controller.preview import RingPreview
+
+CONTENTS = ("constant", "random", "sparse")
+
+# version of the baseline file format
+_FORMAT = 1
+
+_PERCENTILES = (50, 90, 99, 99.9)
+
+
+def synthetic_masks(content, shape, n_frames, change=0.01, pool=16, seed=0):
+    """
+    Stream of synthetic masks.
+
+    Masks are generated up front in a small pool and cycled through, so that
+    generating them does not add to the measured intervals.
+
+    Parameters
+    ----------
+    content : "constant", "random" or "sparse"
+        The same mask every frame, independent random masks, or a random mask
+        of which a fraction of the pixels changes from one frame to the next.
+    shape : tuple(int)
+        Shape of the masks, e.g. (3, N_height, N_width) for a color device.
+    n_frames : int
+        Number of masks.
+    change : float
+        Fraction of the pixels changed between consecutive "sparse" masks.
+    pool : int
+        Number of distinct masks cycled through.
+    seed : int
+        Seed of the random generator.
+
+    Yields
+    ------
+    mask : :py:class:`~numpy.ndarray`
+        uint8 mask, possibly the same array as an earlier one.
+    """
+    assert content in CONTENTS, f"Parameter[content]: expected one of {CONTENTS}."
+    rng = np.random.default_rng(seed)
+
+    if content == "constant":
+        masks = [rng.integers(0, 256, shape, dtype=np.uint8)]
+    elif content == "random":
+        masks = [rng.integers(0, 256, shape, dtype=np.uint8) for _ in range(pool)]
+    else:
+        mask = rng.integers(0, 256, shape, dtype=np.uint8)
+        masks = [mask]
+        n_changed = max(1, int(change * mask.size))
+        for _ in range(pool - 1):
+            mask = mask.copy()
+            index = rng.choice(mask.size, n_changed, replace=False)
+            mask.reshape(-1)[index] = rng.integers(0, 256, n_changed, dtype=np.uint8)
+            masks.append(mask)
+        # back and forth through the pool, so that every step changes the same fraction
+        masks = masks + masks[-2:0:-1]
+
+    for k in range(n_frames):
+        yield masks[k % len(masks)]
+
+
+@dataclass
+class BenchResult:
+    """
+    Timings of a benchmark run.
+
+    Attributes
+    ----------
+    device : str
+        Device key.
+    content : str
+        Content of the masks, see `synthetic_masks`.
+    fps : float or None
+        Target frame rate [Hz], None if masks were shown as fast as possible.
+    declared_fps : float or None
+        Frame rate [Hz] declared for the device in `slm_devices`.
+    simulated : bool
+        Whether the device was simulated.
+    virtual : bool
+        Whether the device was virtual, i.e. without hardware nor simulator, so
+        that only validation and preview were timed.
+    latencies : list(float)
+        Duration [s] of each `imshow` call.
+    starts : list(float)
+        `time.perf_counter` timestamp at which each call started.
+    duration : float
+        Wall-clock duration [s] of the run.
+    bytes : int
+        Number of bytes sent to the device.
+    """
+
+    device: str
+    content: str
+    fps: float = None
+    declared_fps: float = None
+    simulated: bool = False
+    virtual: bool = False
+    latencies: list = field(default_factory=list)
+    starts: list = field(default_factory=list)
+    duration: float = 0.0
+    bytes: int = 0
+
+    @property
+    def frames(self):
+        return len(self.latencies)
+
+    @property
+    def throughput(self):
+        """
+        Returns
+        -------
+        fps : float
+            Masks shown per second [Hz].
+        """
+        if self.duration <= 0:
+            return 0.0
+        return self.frames / self.duration
+
+    @property
+    def intervals(self):
+        """
+        Returns
+        -------
+        intervals : :py:class:`~numpy.ndarray`
+            Time [s] between the ends of consecutive calls.
+        """
+        ends = np.add(self.starts, self.latencies)
+        return np.diff(ends)
+
+    def latency_percentiles(self):
+        """
+        Returns
+        -------
+        percentiles : dict
+            Latency [s] at each percentile of `_PERCENTILES`, e.g. "p99".
+        """
+        return _percentiles(self.latencies)
+
+    def jitter(self):
+        """
+        Returns
+        -------
+        jitter : dict
+            Standard deviation ("std") of the intervals between masks, and
+            percentiles of their absolute deviation from the median interval
+            [s].
+        """
+        intervals = self.intervals
+        if len(intervals) == 0:
+            return {"std": float("nan"), **_percentiles([])}
+        deviation = np.abs(intervals - np.median(intervals))
+        return {"std": float(np.std(intervals)), **_percentiles(deviation)}
+
+    def jitter_histogram(self, bins=12):
+        """
+        Histogram of the intervals between masks.
+
+        Returns
+        -------
+        counts : :py:class:`~numpy.ndarray`
+            Number of intervals in each bin.
+        edges : :py:class:`~numpy.ndarray`
+            (bins + 1,) bin edges [s].
+        """
+        intervals = self.intervals
+        if len(intervals) == 0:
+            return np.zeros(bins, dtype=int), np.zeros(bins + 1)
+        return np.histogram(intervals, bins=bins)
+
+    def summary(self):
+        """
+        Returns
+        -------
+        summary : dict
+            Throughput, latency percentiles and jitter of the run, as compared
+            by `compare`.
+        """
+        return {
+            "frames": self.frames,
+            "throughput": self.throughput,
+            "latency": self.latency_percentiles(),
+            "jitter": self.jitter(),
+            "bytes_per_frame": self.bytes / self.frames if self.frames else 0.0,
+        }
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(**d)
+
+
+def _percentiles(values):
+    if len(values) == 0:
+        return {f"p{p:g}": float("nan") for p in _PERCENTILES}
+    return {f"p{p:g}": float(v) for p, v in zip(_PERCENTILES, np.percentile(values, _PERCENTILES))}
+
+
+def run(device, device_key, content="random", n_frames=200, fps=None, warmup=10, **kwargs):
+    """
+    Time a stream of synthetic masks on a device.
+
+    Parameters
+    ----------
+    device : :py:class:`~slm_controller.slm.SLM`
+        Device to benchmark.
+    device_key : str
+        Name of the device in the results, e.g. its key for `slm.create`.
+    content : str
+        Content of the masks, see `synthetic_masks`.
+    n_frames : int
+        Number of timed masks.
+    fps : float, optional
+        Target frame rate [Hz], masks being paced against a monotonic clock.
+        By default masks are shown as fast as possible.
+    warmup : int
+        Number of masks shown before timing, e.g. to fill caches.
+    **kwargs
+        Passed to `synthetic_masks`.
+
+    Returns
+    -------
+    result : :py:class:`BenchResult`
+        Per-call timings of the run.
+    """
+    shape = device.mask_shape
+    for I in synthetic_masks(content, shape, warmup, **kwargs):
+        device.imshow(I)
+
+    result = BenchResult(
+        device=device_key,
+        content=content,
+        fps=fps,
+        declared_fps=device.frame_rate,
+        simulated=type(device._slm).__module__ == "slm_controller.simulated",
+        virtual=device.virtual,
+    )
+    bytes_before = device.metrics.counters.get("bytes", 0)
+
+    period = 1 / fps if fps else 0.0
+    start = time.perf_counter()
+    for k, I in enumerate(synthetic_masks(content, shape, n_frames, **kwargs)):
+        if period:
+            playback.sleep_until(start + k * period)
+        t0 = time.perf_counter()
+        device.imshow(I)
+        result.latencies.append(time.perf_counter() - t0)
+        result.starts.append(t0)
+    result.duration = time.perf_counter() - start
+    result.bytes = device.metrics.counters.get("bytes", 0) - bytes_before
+    return result
+
+
+def compare(baseline, result, tolerance=0.1):
+    """
+    Compare a run against a baseline of the same device and content.
+
+    Parameters
+    ----------
+    baseline : :py:class:`BenchResult`
+        Reference run.
+    result : :py:class:`BenchResult`
+        New run.
+    tolerance : float
+        Relative degradation tolerated before reporting a regression.
+
+    Returns
+    -------
+    regressions : list(str)
+        Description of every metric that got worse by more than `tolerance`.
+    """
+    regressions = []
+    old, new = baseline.summary(), result.summary()
+    if new["throughput"] < old["throughput"] * (1 - tolerance):
+        regressions.append(f"throughput {old['throughput']:.1f} -> {new['throughput']:.1f} Hz")
+    for group in ("latency", "jitter"):
+        for key in ("p50", "p99"):
+            before, after = old[group][key], new[group][key]
+            if after > before * (1 + tolerance):
+                regressions.append(f"{group} {key} {before * 1e3:.3f} -> {after * 1e3:.3f} ms")
+    return regressions
+
+
+def load_baseline(fname):
+    """
+    Load results saved with `save_baseline`.
+
+    Returns
+    -------
+    results : dict
+        :py:class:`BenchResult` by (device, content).
+    """
+    with open(fname) as f:
+        data = json.load(f)
+    if data.get("format") != _FORMAT:
+        raise ValueError(f"Unsupported baseline format: {data.get('format')}.")
+    results = [BenchResult.from_dict(d) for d in data["results"]]
+    return {(r.device, r.content): r for r in results}
+
+
+def save_baseline(fname, results):
+    """
+    Save results, e.g. of a release, as a JSON baseline.
+
+    Parameters
+    ----------
+    fname : str, path-like
+        Output file.
+    results : iterable(:py:class:`BenchResult`)
+        Results to save.
+    """
+    with open(fname, "w") as f:
+        json.dump({"format": _FORMAT, "results": [r.to_dict() for r in results]}, f)
+
+
+def format_report(result, bins=12, width=40):
+    """
+    Text report of a run: throughput, latency percentiles and histogram of the
+    intervals between masks.
+    """
+    summary = result.summary()
+    declared = f"{result.declared_fps:g} Hz" if result.declared_fps else "unknown"
+    target = f"{result.fps:g} Hz" if result.fps else "as fast as possible"
+    if result.virtual:
+        kind = "virtual, preview only"
+    else:
+        kind = "simulated" if result.simulated else "hardware"
+    lines = [
+        f"{result.device} ({kind}), "
+        f"{result.content} masks, {summary['frames']} frames, target {target}",
+        f"  throughput  {summary['throughput']:10.1f} Hz (declared {declared}), "
+        f"{summary['bytes_per_frame']:.0f} bytes/frame",
+        "  latency    "
+        + "  ".join(f"{k} {v * 1e3:8.3f} ms" for k, v in summary["latency"].items()),
+        "  jitter     " + "  ".join(f"{k} {v * 1e3:8.3f} ms" for k, v in summary["jitter"].items()),
+        "  intervals",
+    ]
+    counts, edges = result.jitter_histogram(bins)
+    top = max(counts.max(), 1)
+    for count, low, high in zip(counts, edges[:-1], edges[1:]):
+        bar = "#" * int(round(width * count / top))
+        lines.append(f"    {low * 1e3:9.3f} - {high * 1e3:9.3f} ms {count:6d} {bar}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    from slm_controller import slm
+
+    parser = argparse.ArgumentParser(prog="slm-bench", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("device", help="Device key, see `slm.available_devices`.")
+    parser.add_argument(
+        "--content", nargs="+", choices=CONTENTS, default=list(CONTENTS), help="Mask content."
+    )
+    parser.add_argument("--frames", type=int, default=200, help="Number of timed masks.")
+    parser.add_argument("--warmup", type=int, default=10, help="Masks shown before timing.")
+    parser.add_argument("--fps", type=float, default=None, help="Target frame rate [Hz].")
+    parser.add_argument(
+        "--change", type=float, default=0.01, help="Fraction of pixels changed by sparse masks."
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random masks.")
+    parser.add_argument("--simulate", action="store_true", help="Use the simulated device.")
+    parser.add_argument(
+        "--show_time",
+        type=float,
+        default=0.0,
+        help="Time [s] a Holoeye SLM shows each mask. Without one, it shows each until closed.",
+    )
+    parser.add_argument(
+        "--preview",
+        action="store_true",
+        help="Show the previews of virtual devices, which otherwise go to memory.",
+    )
+    parser.add_argument("--save", default=None, help="Save the results as a JSON baseline.")
+    parser.add_argument("--compare", default=None, help="Compare with a JSON baseline.")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.1, help="Relative degradation tolerated."
+    )
+    args = parser.parse_args(argv)
+
+    kwargs = {"simulate": True} if args.simulate else {}
+    device = slm.create(args.device, **kwargs)
+    if isinstance(device, slm.HoloeyeSLM):
+        device.set_show_time(args.show_time)
+    if device.virtual:
+        print(f"{args.device}: no device found, timing the virtual device's preview only.")
+        if not args.preview:
+            # the forced window preview would be timed rather than the device
+            device.set_preview(RingPreview(maxlen=1))
+
+    results = []
+    for content in args.content:
+        result = run(
+            device,
+            args.device,
+            content,
+            n_frames=args.frames,
+            fps=args.fps,
+            warmup=args.warmup,
+            change=args.change,
+            seed=args.seed,
+        )
+        results.append(result)
+        print(format_report(result))
+
+    if args.save is not None:
+        save_baseline(args.save, results)
+
+    failed = False
+    if args.compare is not None:
+        baseline = load_baseline(args.compare)
+        for result in results:
+            reference = baseline.get((result.device, result.content))
+            if reference is None:
+                print(f"{result.device}/{result.content}: not in baseline")
+                continue
+            regressions = compare(reference, result, tolerance=args.tolerance)
+            for regression in regressions:
+                print(f"{result.device}/{result.content}: regression, {regression}")
+            failed |= bool(regressions)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
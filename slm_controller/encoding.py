@@ -0,0 +1,224 @@
+"""
+Vectorized encoders from masks to the raw pixel formats of the display controllers.
+"""
+
+import numpy as np
+
+# Contribution of each 8-bit channel value to an RGB565 pixel, stored big-endian
+# as expected by the ST7735.
+_VALUES = np.arange(256, dtype=np.uint16)
+_RED565 = ((_VALUES & 0xF8) << 8).astype(">u2")
+_GREEN565 = ((_VALUES & 0xFC) << 3).astype(">u2")
+_BLUE565 = (_VALUES >> 3).astype(">u2")
+_GRAY565 = _RED565 | _GREEN565 | _BLUE565
+
+
+class RGB565Encoder:
+    def __init__(self, shape, rotation=0):
+        """
+        Encoder from uint8 masks to the big-endian RGB565 pixel stream of the
+        ST7735 controller.
+
+        The rotation applied by the display driver is folded into a precomputed
+        index map, so that encoding is a gather and a table lookup per channel.
+        The output is written into a buffer that is reused across calls.
+
+        Parameters
+        ----------
+        shape : tuple(int)
+            (N_height, N_width) of the masks.
+        rotation : 0, 90, 180, or 270
+            Counter-clockwise rotation of the mask on the display.
+        """
+        if rotation not in (0, 90, 180, 270):
+            raise ValueError("Rotation must be 0/90/180/270")
+
+        self._shape = tuple(shape)
+        self._rotation = rotation
+
+        # for each display pixel, flat index of the mask pixel it shows
+        index = np.arange(np.prod(shape), dtype=np.intp).reshape(shape)
+        self._index = np.ascontiguousarray(np.rot90(index, k=rotation // 90))
+
+        n_pixels = self._index.size
+        self._buffer = np.empty(n_pixels, dtype=">u2")
+        self._scratch = np.empty(n_pixels, dtype=">u2")
+        self._channel = np.empty(n_pixels, dtype=np.uint8)
+
+    @property
+    def display_shape(self):
+        """
+        Returns
+        -------
+        sh : tuple(int)
+            (N_rows, N_columns) of the encoded frame, in display orientation.
+        """
+        return self._index.shape
+
+    def display_window(self, roi):
+        """
+        Map a region of the mask to the corresponding region on the display.
+
+        Parameters
+        ----------
+        roi : tuple(int)
+            (row_start, col_start, row_stop, col_stop) in mask coordinates.
+
+        Returns
+        -------
+        window : tuple(int)
+            (row_start, col_start, row_stop, col_stop) in display coordinates.
+        """
+        row_start, col_start, row_stop, col_stop = roi
+        height, width = self._shape
+        if self._rotation == 0:
+            return row_start, col_start, row_stop, col_stop
+        elif self._rotation == 90:
+            return width - col_stop, row_start, width - col_start, row_stop
+        elif self._rotation == 180:
+            return height - row_stop, width - col_stop, height - row_start, width - col_start
+        else:
+            return col_start, height - row_stop, col_stop, height - row_start
+
+    def encode(self, I, window=None):
+        """
+        Encode a mask into RGB565.
+
+        Parameters
+        ----------
+        I : :py:class:`~numpy.ndarray`
+            ([3,] N_height, N_width) uint8 mask. 2D inputs are interpreted as
+            grayscale, 3D inputs as RGB.
+        window : tuple(int), optional
+            (row_start, col_start, row_stop, col_stop) region to encode, in
+            display coordinates. By default the whole frame is encoded.
+
+        Returns
+        -------
+        encoded : :py:class:`~numpy.ndarray`
+            (N_rows, N_columns) big-endian uint16 pixels in display orientation.
+            This is a view of an internal buffer, overwritten by the next call.
+        """
+        assert I.shape[-2:] == self._shape
+        index = self._index
+        if window is not None:
+            row_start, col_start, row_stop, col_stop = window
+            index = index[row_start:row_stop, col_start:col_stop]
+
+        n_pixels = index.size
+        out = self._buffer[:n_pixels].reshape(index.shape)
+        channel = self._channel[:n_pixels].reshape(index.shape)
+
+        if I.ndim == 2:
+            np.take(I.ravel(), index, out=channel)
+            np.take(_GRAY565, channel, out=out)
+        else:
+            scratch = self._scratch[:n_pixels].reshape(index.shape)
+            np.take(I[0].ravel(), index, out=channel)
+            np.take(_RED565, channel, out=out)
+            np.take(I[1].ravel(), index, out=channel)
+            np.take(_GREEN565, channel, out=scratch)
+            np.bitwise_or(out, scratch, out=out)
+            np.take(I[2].ravel(), index, out=channel)
+            np.take(_BLUE565, channel, out=scratch)
+            np.bitwise_or(out, scratch, out=out)
+        return out
+
+
+def as_bytes(encoded):
+    """
+    Raw byte view of an encoded frame or window, copying only if it is not
+    contiguous.
+
+    Parameters
+    ----------
+    encoded : :py:class:`~numpy.ndarray`
+        Encoded pixels.
+
+    Returns
+    -------
+    data : memoryview
+        Bytes to write to the display controller.
+    """
+    return memoryview(np.ascontiguousarray(encoded).reshape(-1).view(np.uint8))
+
+
+class PCD8544Encoder:
+    def __init__(self, shape, threshold=128):
+        """
+        Encoder from uint8 masks to the frame buffer layout of the PCD8544
+        controller: one byte per column and bank of 8 display rows, least
+        significant bit on top, banks stored one after the other.
+
+        The display shows masks transposed, i.e. mask rows are display columns.
+        Pixels below `threshold` are driven dark, the others are transparent.
+
+        Parameters
+        ----------
+        shape : tuple(int)
+            (N_height, N_width) of the masks. `N_width` must be a multiple of 8.
+        threshold : int
+            Mask values below this are shown as dark pixels.
+        """
+        assert shape[1] % 8 == 0
+
+        self._shape = tuple(shape)
+        self._threshold = threshold
+        self._bits = np.empty(shape, dtype=bool)
+        self._buffer = np.empty((shape[1] // 8, shape[0]), dtype=np.uint8)
+
+    @property
+    def display_shape(self):
+        """
+        Returns
+        -------
+        sh : tuple(int)
+            (N_banks, N_columns) of the encoded frame.
+        """
+        return self._buffer.shape
+
+    def encode(self, I):
+        """
+        Threshold and bit-pack a mask.
+
+        Parameters
+        ----------
+        I : :py:class:`~numpy.ndarray`
+            (N_height, N_width) uint8 mask.
+
+        Returns
+        -------
+        encoded : :py:class:`~numpy.ndarray`
+            (N_banks, N_columns) uint8 frame buffer. This is a view of an
+            internal buffer, overwritten by the next call.
+        """
+        assert I.shape == self._shape
+        np.less(I, self._threshold, out=self._bits)
+
+        # (columns, banks, 8 rows) -> one byte per column and bank
+        packed = np.packbits(self._bits.reshape(self._shape[0], -1, 8), axis=-1, bitorder="little")
+        np.copyto(self._buffer, packed[..., 0].T)
+        return self._buffer
+
+
+def bit_planes(I, n_bits=8):
+    """
+    Split masks into binary-weighted bit planes, e.g. to show gray levels on a
+    binary display by temporal modulation.
+
+    Parameters
+    ----------
+    I : :py:class:`~numpy.ndarray`
+        uint8 mask(s), any shape.
+    n_bits : int
+        Number of most significant bits kept, 1 to 8.
+
+    Returns
+    -------
+    planes : :py:class:`~numpy.ndarray`
+        (n_bits, *I.shape) bool planes, plane `k` holding the bit of weight
+        `2**k` among the kept bits.
+    """
+    assert 1 <= n_bits <= 8
+    shifts = np.arange(8 - n_bits, 8, dtype=np.uint8).reshape((-1,) + (1,) * I.ndim)
+    return ((I[np.newaxis] >> shifts) & 1).astype(bool)
@@ -0,0 +1,142 @@
+"""
+Device-ready frames and a content-addressed cache of them.
+"""
+
+import hashlib
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+CacheInfo = namedtuple(
+    "CacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize", "nbytes"]
+)
+
+
+class PreparedFrame:
+    __slots__ = ("device", "mask", "data")
+
+    def __init__(self, device, mask, data):
+        """
+        Mask already validated and encoded for a given SLM, see `SLM.prepare`.
+
+        Parameters
+        ----------
+        device : :py:class:`~slm_controller.slm.SLM`
+            SLM the frame was prepared for.
+        mask : :py:class:`~numpy.ndarray`
+            Read-only copy of the original mask, used for previews.
+        data : object
+            Device-specific encoded frame.
+        """
+        self.device = device
+        self.mask = mask
+        self.data = data
+
+    @property
+    def nbytes(self):
+        """
+        Returns
+        -------
+        nbytes : int
+            Memory held by the mask and its encoding [bytes].
+        """
+        if self.data is self.mask:
+            return self.mask.nbytes
+        return self.mask.nbytes + getattr(self.data, "nbytes", 0)
+
+
+def frame_key(I):
+    """
+    Content hash of a mask, including its shape and dtype.
+
+    Parameters
+    ----------
+    I : :py:class:`~numpy.ndarray`
+        Mask to hash.
+
+    Returns
+    -------
+    key : bytes
+        Digest identifying the mask content.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str((I.shape, I.dtype.str)).encode())
+    h.update(np.ascontiguousarray(I).data)
+    return h.digest()
+
+
+class FrameCache:
+    def __init__(self, maxsize):
+        """
+        Bounded least-recently-used cache of prepared frames, keyed by mask
+        content.
+
+        Parameters
+        ----------
+        maxsize : int
+            Maximum number of frames kept.
+        """
+        assert maxsize > 0
+        self._maxsize = maxsize
+        self._frames = OrderedDict()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, I, prepare):
+        """
+        Return the prepared frame for a mask, preparing and caching it on a miss.
+
+        Parameters
+        ----------
+        I : :py:class:`~numpy.ndarray`
+            Mask to look up.
+        prepare : callable
+            Called with `I` to build the :py:class:`PreparedFrame` on a miss.
+
+        Returns
+        -------
+        frame : :py:class:`PreparedFrame`
+            Cached or newly prepared frame.
+        """
+        key = frame_key(I)
+        frame = self._frames.get(key)
+        if frame is not None:
+            self._frames.move_to_end(key)
+            self._hits += 1
+            return frame
+
+        self._misses += 1
+        frame = prepare(I)
+        self._frames[key] = frame
+        self._nbytes += frame.nbytes
+        while len(self._frames) > self._maxsize:
+            _, evicted = self._frames.popitem(last=False)
+            self._nbytes -= evicted.nbytes
+            self._evictions += 1
+        return frame
+
+    def clear(self):
+        """
+        Remove all frames, keeping the statistics.
+        """
+        self._frames.clear()
+        self._nbytes = 0
+
+    def info(self):
+        """
+        Returns
+        -------
+        info : :py:class:`CacheInfo`
+            Hits, misses, evictions, maximum and current number of frames, and
+            memory held [bytes].
+        """
+        return CacheInfo(
+            self._hits,
+            self._misses,
+            self._evictions,
+            self._maxsize,
+            len(self._frames),
+            self._nbytes,
+        )
@@ -0,0 +1,216 @@
+"""
+Several SLMs driven as one device.
+"""
+
+import threading
+import time
+import warnings
+from collections import namedtuple
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+from slm_controller import playback
+from slm_controller.slm import _defer_previews, _show_deferred_previews
+
+GroupPresentation = namedtuple("GroupPresentation", ["started", "presented", "skew", "transferred"])
+GroupPresentation.__doc__ = """
+Timing of a mask set shown by an `SLMGroup`: `time.perf_counter` timestamps at
+which each device call started, returned and finished sending its mask, as
+dicts keyed by device name, and the spread [s] of the transfer ends. Transfers
+end before the call returns for devices that wait while the mask is shown, e.g.
+`HoloeyeSLM` with a show time.
+"""
+
+
+class SLMGroup:
+    def __init__(self, devices, max_skew=None):
+        """
+        SLMs showing masks together, e.g. a phase SLM and an amplitude mask.
+
+        For each set of masks, validation, preview and encoding run on all
+        devices concurrently. The threads then meet at a barrier, so that the
+        transfers start together once every device is ready, and the spread of
+        the times at which they end is reported. Previews are shown from the
+        calling thread.
+
+        Parameters
+        ----------
+        devices : dict or sequence(:py:class:`~slm_controller.slm.SLM`)
+            Devices, e.g. from `slm.create`, by name or in order. Devices of a
+            sequence are named by their index.
+        max_skew : float, optional
+            Spread [s] of the transfer ends above which a warning is issued.
+        """
+        if isinstance(devices, dict):
+            self._devices = dict(devices)
+        else:
+            self._devices = dict(enumerate(devices))
+        assert len(self._devices) > 0, "An SLM group needs at least one device."
+
+        self._max_skew = max_skew
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(self._devices), thread_name_prefix="slm-group"
+        )
+        self._skews = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self._devices)
+
+    def __getitem__(self, name):
+        return self._devices[name]
+
+    @property
+    def names(self):
+        return list(self._devices)
+
+    @property
+    def skews(self):
+        """
+        Returns
+        -------
+        skews : list(float)
+            Spread [s] of the transfer ends of every mask set shown so far.
+        """
+        return list(self._skews)
+
+    def imshow(self, masks):
+        """
+        Show one mask per device, concurrently.
+
+        Parameters
+        ----------
+        masks : dict or sequence(:py:class:`~numpy.ndarray`)
+            Masks by device name, or in the order of the devices. Devices
+            without a mask, or whose mask is None, are left as they are.
+
+        Returns
+        -------
+        presentation : :py:class:`GroupPresentation`
+            Start, completion and transfer end timestamps of the device calls,
+            and the spread of the transfer ends. Calls of `HoloeyeSLM` return
+            after the show time.
+        """
+        if not isinstance(masks, dict):
+            if len(masks) != len(self._devices):
+                raise ValueError(
+                    f"Parameter[masks]: expected {len(self._devices)} masks, got {len(masks)}."
+                )
+            masks = dict(zip(self._devices, masks))
+        for name in masks:
+            if name not in self._devices:
+                raise ValueError(f"Parameter[masks]: unknown device {name}.")
+        masks = {name: I for name, I in masks.items() if I is not None}
+        if not masks:
+            return GroupPresentation({}, {}, 0.0, {})
+
+        barrier = threading.Barrier(len(masks))
+        futures = {
+            name: self._executor.submit(self._show, self._devices[name], I, barrier)
+            for name, I in masks.items()
+        }
+
+        started, presented, transferred, previews, errors = {}, {}, {}, [], []
+        for name, future in futures.items():
+            try:
+                started[name], transferred[name], presented[name], staged = future.result()
+                previews.extend(staged)
+            except threading.BrokenBarrierError:
+                # another device failed before the barrier
+                pass
+            except Exception as e:
+                errors.append(e)
+        _show_deferred_previews(previews)
+        if errors:
+            raise errors[0]
+
+        skew = max(transferred.values()) - min(transferred.values())
+        self._skews.append(skew)
+        if self._max_skew is not None and skew > self._max_skew:
+            warnings.warn(
+                f"Masks presented with a skew of {skew * 1e3:.3f} ms, "
+                f"above {self._max_skew * 1e3:.3f} ms."
+            )
+        return GroupPresentation(started, presented, skew, transferred)
+
+    @staticmethod
+    def _show(device, I, barrier):
+        """
+        Stage and present a mask on one device, from a thread of the group.
+
+        Returns
+        -------
+        timing : tuple
+            Start, transfer end and completion timestamps of the device call,
+            and the previews to show from the calling thread.
+        """
+        try:
+            with _defer_previews() as previews:
+                data = device._stage(I)
+        except Exception:
+            barrier.abort()
+            raise
+        barrier.wait()
+
+        start = time.perf_counter()
+        if not device._slm:
+            return start, start, start, previews
+
+        device._transferred = None
+        future = device._present(data)
+        try:
+            presented = future.result() if future is not None else time.perf_counter()
+        except CancelledError:
+            # superseded by a mask submitted outside the group
+            presented = time.perf_counter()
+        transferred = device._transferred if device._transferred is not None else presented
+        return start, transferred, presented, previews
+
+    def clear(self):
+        """
+        Clear all devices, concurrently.
+        """
+        for future in [self._executor.submit(device.clear) for device in self._devices.values()]:
+            future.result()
+
+    def play(self, frames, fps=None, drop_late=True, late_tolerance=None):
+        """
+        Show a sequence of mask sets at a target frame rate, see
+        :py:func:`slm_controller.playback.play`.
+
+        Parameters
+        ----------
+        frames : iterable
+            Mask sets accepted by `imshow`.
+        fps : float, optional
+            Target frame rate [Hz], by default the lowest `frame_rate` of the
+            devices that declare one.
+        drop_late : bool
+            Skip mask sets whose time slot has already passed.
+        late_tolerance : float, optional
+            Delay [s] after its deadline from which a mask set is counted as
+            late, by default 10% of the frame period.
+
+        Returns
+        -------
+        stats : :py:class:`~slm_controller.playback.PlaybackStats`
+            Presented, dropped and late mask sets of the run. Their skews are
+            appended to `skews`.
+        """
+        if fps is None:
+            rates = [d.frame_rate for d in self._devices.values() if d.frame_rate]
+            fps = min(rates) if rates else None
+
+        return playback.play(
+            self.imshow, frames, fps=fps, drop_late=drop_late, late_tolerance=late_tolerance
+        )
+
+    def close(self):
+        """
+        Stop the threads of the group. The devices are left open.
+        """
+        self._executor.shutdown(wait=True)
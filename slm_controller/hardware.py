@@ -20,6 +20,7 @@ class SLMParam:
     FILL_FACTOR = "fill_factor"
     FRAME_RATE = "frame_rate"
     AMPLITUDE = "amplitude_or_phase"
+    BIT_DEPTH = "bit_depth"
 
 
 # Actual values of those parameters for all the SLMs
@@ -31,6 +32,7 @@ slm_devices = {
         SLMParam.SLM_SHAPE: (128, 160),
         SLMParam.MONOCHROME: False,
         SLMParam.AMPLITUDE: True,
+        SLMParam.BIT_DEPTH: (5, 6, 5),  # RGB565
     },
     # Graphic LCD 84x48 - Nokia 5110
     # https://www.sparkfun.com/products/10168
@@ -41,6 +43,7 @@ slm_devices = {
         SLMParam.SLM_SHAPE: (84, 48),
         SLMParam.MONOCHROME: True,
         SLMParam.AMPLITUDE: True,
+        SLMParam.BIT_DEPTH: 1,
     },
     # Holoeye SLM - LC 2012
     # https://holoeye.com/lc-2012-spatial-light-modulator/
@@ -53,5 +56,6 @@ slm_devices = {
         SLMParam.AMPLITUDE: False,
         SLMParam.FILL_FACTOR: 0.58,
         SLMParam.FRAME_RATE: 60,
+        SLMParam.BIT_DEPTH: 8,
     },
 }
@@ -0,0 +1,204 @@
+"""
+Per-stage timings and counters of SLM calls.
+
+Every SLM records, for each `imshow`, how long its stages took:
+
+- `validate`: checking the mask,
+- `preview`: plotting the mask, when previewing,
+- `encode`: converting the mask to the device format,
+- `clear`: blanking the device,
+- `transfer`: sending the encoded mask to the device,
+- `wait`: waiting for the device, e.g. the Holoeye show time,
+- `imshow`: the whole call, as seen by the caller.
+
+Opening and closing the device are recorded under `open` and `close`.
+
+Stages a device does not go through are not recorded. In asynchronous mode,
+`clear`, `transfer` and `wait` are recorded by the presentation worker.
+"""
+
+import bisect
+import threading
+import time
+
+STAGES = ("validate", "preview", "encode", "clear", "transfer", "wait", "imshow", "open", "close")
+
+
+class LatencyHistogram:
+    # upper bounds of the buckets [s], 10 per decade from 1 us to 100 s
+    BOUNDS = tuple(10 ** (k / 10) for k in range(-60, 21))
+
+    def __init__(self):
+        """
+        Histogram of durations over logarithmic buckets, so that quantiles are
+        known to within about 25% whatever the time scale.
+        """
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else float("nan")
+
+    def quantile(self, q):
+        """
+        Estimate a quantile of the recorded durations.
+
+        Parameters
+        ----------
+        q : float
+            Quantile, between 0 and 1.
+
+        Returns
+        -------
+        seconds : float
+            Upper bound of the bucket holding the quantile, clipped to the
+            largest recorded duration. NaN if nothing was recorded.
+        """
+        if not self.count:
+            return float("nan")
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.BOUNDS, self.counts):
+            cumulative += count
+            if cumulative >= rank and cumulative > 0:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        """
+        Returns
+        -------
+        summary : dict
+            Count, mean, min, max and 50th, 90th and 99th percentiles [s].
+        """
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min if self.count else float("nan"),
+            "max": self.max if self.count else float("nan"),
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+
+class Metrics:
+    def __init__(self, callback=None):
+        """
+        Stage latency histograms and counters of an SLM.
+
+        Updates are thread-safe, as stages may be recorded by a background
+        worker.
+
+        Parameters
+        ----------
+        callback : callable, optional
+            Called with `(stage, seconds)` for every recorded duration, e.g. to
+            forward timings to a monitoring system. It is called from the thread
+            that performed the stage and should return quickly.
+        """
+        self.callback = callback
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def time(self, stage):
+        """
+        Context manager recording the duration of its block under `stage`.
+
+        If the block raises, the duration is still recorded and the
+        `<stage>_errors` counter is incremented.
+        """
+        return _Timer(self, stage)
+
+    def record(self, stage, seconds):
+        """
+        Record the duration of a stage.
+
+        Parameters
+        ----------
+        stage : str
+            Stage name, see `STAGES`.
+        seconds : float
+            Duration [s].
+        """
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram()
+            histogram.add(seconds)
+        if self.callback is not None:
+            self.callback(stage, seconds)
+
+    def increment(self, name, n=1):
+        """
+        Increment a counter, e.g. `frames` or `bytes`.
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    @property
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def histogram(self, stage):
+        """
+        Returns
+        -------
+        histogram : :py:class:`LatencyHistogram` or None
+            Durations recorded for `stage`, None if there are none.
+        """
+        return self._histograms.get(stage)
+
+    def summary(self):
+        """
+        Returns
+        -------
+        summary : dict
+            Summary of each recorded stage, see `LatencyHistogram.summary`, in
+            the order of `STAGES`, and the counters under `counters`.
+        """
+        with self._lock:
+            order = sorted(
+                self._histograms, key=lambda s: STAGES.index(s) if s in STAGES else len(STAGES)
+            )
+            summary = {stage: self._histograms[stage].summary() for stage in order}
+            summary["counters"] = dict(self._counters)
+        return summary
+
+    def reset(self):
+        """
+        Forget all recorded durations and counters.
+        """
+        with self._lock:
+            self._histograms = {}
+            self._counters = {}
+
+
+class _Timer:
+    __slots__ = ("_metrics", "_stage", "_start")
+
+    def __init__(self, metrics, stage):
+        self._metrics = metrics
+        self._stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._metrics.record(self._stage, time.perf_counter() - self._start)
+        if exc_type is not None:
+            self._metrics.increment(f"{self._stage}_errors")
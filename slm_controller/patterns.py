@@ -0,0 +1,469 @@
+"""
+Calibration and imaging patterns generated at the resolution of a device.
+
+Every family is a generator of uint8 masks in the layout the device's `imshow`
+expects, e.g. (3, N_height, N_width) for the Adafruit, built from the shape
+and pixel pitch in `slm_devices`:
+
+- `gratings`: sinusoidal, binary or blazed gratings,
+- `checkerboards`: checkerboards and their complements,
+- `zernike`: Zernike phase maps, converted to gray levels through the phase
+  LUT of phase SLMs (see :py:mod:`slm_controller.phase`),
+- `hadamard`: separable Hadamard / Walsh bases, e.g. the 84 x 48 = 4032
+  patterns of the Nokia, for single-pixel imaging,
+- `speckle`: random speckle patterns of a given grain size.
+
+Patterns are computed lazily with NumPy, one frame at a time or `batch_size`
+frames at a time as (N_frame, ...) stacks, so that large sets are streamed
+rather than built in lists. Lengths are in meters on the device, or in pixels
+with `unit="px"`.
+"""
+
+import functools
+import itertools
+import math
+
+import numpy as np
+
+from slm_controller.hardware import SLMParam, slm_devices
+from slm_controller.phase import phase_to_gray
+
+_TWO_PI = 2 * np.pi
+
+
+def _coordinates(device_key, unit):
+    """
+    Centered (N_height, 1) and (1, N_width) coordinates of the device pixels, in
+    meters or pixels.
+    """
+    assert unit in ("m", "px"), "Parameter[unit]: expected 'm' or 'px'."
+    height, width = slm_devices[device_key][SLMParam.SLM_SHAPE]
+    pitch = slm_devices[device_key][SLMParam.PIXEL_PITCH] if unit == "m" else (1.0, 1.0)
+    y = (np.arange(height, dtype=np.float32) - (height - 1) / 2) * np.float32(pitch[0])
+    x = (np.arange(width, dtype=np.float32) - (width - 1) / 2) * np.float32(pitch[1])
+    return y[:, np.newaxis], x[np.newaxis, :]
+
+
+def _frames(device_key, n_frames, render, batch_size):
+    """
+    Generate frames in the layout of a device.
+
+    Parameters
+    ----------
+    n_frames : int
+        Number of frames.
+    render : callable
+        Called with `(start, stop)` to compute frames [start, stop) as a
+        (stop - start, N_height, N_width) uint8 array.
+    batch_size : int or None
+        Number of frames per stack, None to yield single frames.
+    """
+    color = not slm_devices[device_key][SLMParam.MONOCHROME]
+    step = batch_size or 1
+    for start in range(0, n_frames, step):
+        frames = render(start, min(start + step, n_frames))
+        if color:
+            frames = np.repeat(frames[:, np.newaxis], 3, axis=1)
+        if batch_size is None:
+            yield frames[0]
+        else:
+            yield frames
+
+
+def _to_uint8(values):
+    """
+    Convert values in [0, 1] to uint8 gray levels.
+    """
+    out = np.empty(values.shape, dtype=np.uint8)
+    np.multiply(values, np.float32(255), out=values)
+    np.rint(values, out=values)
+    np.copyto(out, values, casting="unsafe")
+    return out
+
+
+def _phase_to_uint8(phase, device_key, wavelength):
+    """
+    Gray levels of phases, through the LUT of phase SLMs, or wrapped linearly
+    over [0, 255] for amplitude SLMs.
+    """
+    if not slm_devices[device_key][SLMParam.AMPLITUDE]:
+        return phase_to_gray(phase, device_key=device_key, wavelength=wavelength)
+    wrapped = np.mod(phase, np.float32(_TWO_PI)) * np.float32(256 / _TWO_PI)
+    return np.minimum(wrapped, 255).astype(np.uint8)
+
+
+def _grid(*values):
+    """
+    All combinations of the given scalars or sequences, as one array per
+    argument.
+    """
+    combinations = list(itertools.product(*[np.atleast_1d(v) for v in values]))
+    return [np.array(column, dtype=np.float32) for column in zip(*combinations)]
+
+
+def gratings(
+    device_key, periods, angles=0.0, phases=0.0, profile="sinusoidal", unit="m", batch_size=None
+):
+    """
+    Gratings of all combinations of periods, angles and phases.
+
+    Parameters
+    ----------
+    device_key : str
+        Option from `SLMDevices`.
+    periods : float or sequence(float)
+        Grating periods [m or px].
+    angles : float or sequence(float)
+        Orientation [rad] of the grating vector, 0 along the width.
+    phases : float or sequence(float)
+        Phase shifts [rad], e.g. for phase-shifting interferometry.
+    profile : "sinusoidal", "binary" or "blazed"
+        Profile over one period.
+    unit : "m" or "px"
+        Unit of `periods`.
+    batch_size : int, optional
+        Yield stacks of this many frames rather than single frames.
+
+    Yields
+    ------
+    mask : :py:class:`~numpy.ndarray`
+        ([N_frame,] [3,] N_height, N_width) uint8 mask(s), periods varying
+        slowest and phases fastest.
+    """
+    assert profile in ("sinusoidal", "binary", "blazed")
+    y, x = _coordinates(device_key, unit)
+    periods, angles, phases = _grid(periods, angles, phases)
+
+    def render(start, stop):
+        sl = slice(start, stop)
+        fx = (np.cos(angles[sl]) / periods[sl])[:, np.newaxis, np.newaxis]
+        fy = (np.sin(angles[sl]) / periods[sl])[:, np.newaxis, np.newaxis]
+        # phase in cycles
+        cycles = fx * x + fy * y + (phases[sl] / np.float32(_TWO_PI))[:, np.newaxis, np.newaxis]
+        if profile == "blazed":
+            values = np.mod(cycles, np.float32(1), dtype=np.float32)
+        elif profile == "binary":
+            values = (np.mod(cycles, np.float32(1)) < 0.5).astype(np.float32)
+        else:
+            values = np.cos(np.float32(_TWO_PI) * cycles, dtype=np.float32)
+            values = (values + 1) / 2
+        return _to_uint8(values)
+
+    return _frames(device_key, len(periods), render, batch_size)
+
+
+def checkerboards(device_key, sizes, complementary=False, unit="px", batch_size=None):
+    """
+    Checkerboards of the given square sizes, anchored at the device center.
+
+    Parameters
+    ----------
+    device_key : str
+        Option from `SLMDevices`.
+    sizes : float or sequence(float)
+        Side of the squares [px or m].
+    complementary : bool
+        Follow each checkerboard by its complement.
+    unit : "px" or "m"
+        Unit of `sizes`.
+    batch_size : int, optional
+        Yield stacks of this many frames rather than single frames.
+
+    Yields
+    ------
+    mask : :py:class:`~numpy.ndarray`
+        ([N_frame,] [3,] N_height, N_width) uint8 mask(s) of 0 and 255.
+    """
+    y, x = _coordinates(device_key, unit)
+    sizes = np.atleast_1d(np.asarray(sizes, dtype=np.float32))
+    repeat = 2 if complementary else 1
+
+    def render(start, stop):
+        index = np.arange(start, stop)
+        size = sizes[index // repeat][:, np.newaxis, np.newaxis]
+        parity = np.floor(y / size).astype(int) + np.floor(x / size).astype(int)
+        on = (parity % 2 == 0) ^ (index % repeat == 1)[:, np.newaxis, np.newaxis]
+        return np.where(on, np.uint8(255), np.uint8(0))
+
+    return _frames(device_key, repeat * len(sizes), render, batch_size)
+
+
+def noll_to_zernike(j):
+    """
+    Radial order and azimuthal frequency of the Zernike polynomial of Noll index
+    `j`, starting at 1 for the piston.
+
+    Returns
+    -------
+    n, m : int
+        Radial order and signed azimuthal frequency, negative for sine terms.
+    """
+    assert j >= 1
+    n, j1 = 0, j - 1
+    while j1 > n:
+        n += 1
+        j1 -= n
+    m = (-1) ** j * ((n % 2) + 2 * ((j1 + (n + 1) % 2) // 2))
+    return n, m
+
+
+def _zernike(j, rho, theta):
+    """
+    Zernike polynomial of Noll index `j`, normalized to unit RMS over the
+    pupil.
+    """
+    n, m = noll_to_zernike(j)
+    radial = np.zeros_like(rho)
+    for k in range((n - abs(m)) // 2 + 1):
+        coefficient = (
+            (-1) ** k
+            * math.factorial(n - k)
+            / (
+                math.factorial(k)
+                * math.factorial((n + abs(m)) // 2 - k)
+                * math.factorial((n - abs(m)) // 2 - k)
+            )
+        )
+        radial += np.float32(coefficient) * rho ** (n - 2 * k)
+    if m == 0:
+        return np.float32(np.sqrt(n + 1)) * radial
+    angular = np.cos(m * theta) if m > 0 else np.sin(-m * theta)
+    return np.float32(np.sqrt(2 * (n + 1))) * radial * angular
+
+
+def zernike(
+    device_key,
+    indices,
+    amplitudes=1.0,
+    radius=None,
+    wavelength=None,
+    unit="m",
+    batch_size=None,
+):
+    """
+    Zernike phase maps of all combinations of Noll indices and amplitudes.
+
+    Phases are wrapped and converted to gray levels through the phase LUT of
+    the device, see :py:func:`~slm_controller.phase.phase_to_gray`, or mapped
+    linearly over [0, 255] for amplitude SLMs. The phase is 0 outside the
+    pupil.
+
+    Parameters
+    ----------
+    device_key : str
+        Option from `SLMDevices`.
+    indices : int or sequence(int)
+        Noll indices, 1 being the piston, 4 the defocus.
+    amplitudes : float or sequence(float)
+        RMS amplitudes [waves] of the polynomials.
+    radius : float, optional
+        Pupil radius [m or px], by default that of the largest circle
+        inscribed in the device.
+    wavelength : float, optional
+        Wavelength [m], to select the phase LUT.
+    unit : "m" or "px"
+        Unit of `radius`.
+    batch_size : int, optional
+        Yield stacks of this many frames rather than single frames.
+
+    Yields
+    ------
+    mask : :py:class:`~numpy.ndarray`
+        ([N_frame,] [3,] N_height, N_width) uint8 mask(s), indices varying
+        slowest.
+    """
+    y, x = _coordinates(device_key, unit)
+    if radius is None:
+        radius = min(-y[0, 0], -x[0, 0])
+    rho = np.sqrt(x**2 + y**2) / np.float32(radius)
+    theta = np.arctan2(y, x)
+    pupil = rho <= 1
+
+    combinations = list(itertools.product(np.atleast_1d(indices), np.atleast_1d(amplitudes)))
+
+    @functools.lru_cache(maxsize=8)
+    def polynomial(j):
+        return np.where(pupil, _zernike(int(j), rho, theta), np.float32(0))
+
+    def render(start, stop):
+        phase = np.stack(
+            [
+                np.float32(_TWO_PI * amplitude) * polynomial(j)
+                for j, amplitude in combinations[start:stop]
+            ]
+        )
+        return _phase_to_uint8(phase, device_key, wavelength)
+
+    return _frames(device_key, len(combinations), render, batch_size)
+
+
+def _is_prime(n):
+    return n >= 2 and all(n % d for d in range(2, int(np.sqrt(n)) + 1))
+
+
+def _jacobsthal(q):
+    """
+    (q, q) Jacobsthal matrix of a prime `q`: quadratic character of `j - i`.
+    """
+    chi = -np.ones(q, dtype=np.int8)
+    chi[(np.arange(1, q) ** 2) % q] = 1
+    chi[0] = 0
+    index = np.arange(q)
+    return chi[(index[np.newaxis, :] - index[:, np.newaxis]) % q]
+
+
+def _hadamard(n):
+    if n == 1:
+        return np.ones((1, 1), dtype=np.int8)
+    if n % 4 and n != 2:
+        return None
+    if n % 2 == 0:
+        half = _hadamard(n // 2)
+        if half is not None:
+            # Sylvester construction
+            return np.block([[half, half], [half, -half]])
+    q = n - 1
+    if _is_prime(q) and q % 4 == 3:
+        # Paley construction I
+        S = np.zeros((n, n), dtype=np.int8)
+        S[0, 1:] = 1
+        S[1:, 0] = -1
+        S[1:, 1:] = _jacobsthal(q)
+        return S + np.eye(n, dtype=np.int8)
+    q = n // 2 - 1
+    if _is_prime(q) and q % 4 == 1:
+        # Paley construction II
+        C = np.zeros((q + 1, q + 1), dtype=np.int8)
+        C[0, 1:] = 1
+        C[1:, 0] = 1
+        C[1:, 1:] = _jacobsthal(q)
+        H = np.kron(C, np.array([[1, 1], [1, -1]], dtype=np.int8))
+        return H + np.kron(
+            np.eye(q + 1, dtype=np.int8), np.array([[1, -1], [-1, -1]], dtype=np.int8)
+        )
+    return None
+
+
+@functools.lru_cache(maxsize=16)
+def hadamard_matrix(n, order="natural"):
+    """
+    Hadamard matrix of order `n`, from the Sylvester and Paley constructions.
+
+    Parameters
+    ----------
+    n : int
+        Order, e.g. any power of 2, 12, 20, 48 or 84.
+    order : "natural" or "sequency"
+        Order of the rows: as constructed, or by increasing number of sign
+        changes, i.e. Walsh order for powers of 2.
+
+    Returns
+    -------
+    H : :py:class:`~numpy.ndarray`
+        (n, n) read-only int8 matrix of +1 and -1, with orthogonal rows.
+    """
+    assert order in ("natural", "sequency")
+    H = _hadamard(n)
+    if H is None:
+        raise ValueError(f"Parameter[n]: no Hadamard matrix of order {n} can be constructed.")
+    if order == "sequency":
+        changes = np.count_nonzero(np.diff(H, axis=1), axis=1)
+        H = H[np.argsort(changes, kind="stable")]
+    H.setflags(write=False)
+    return H
+
+
+def hadamard(device_key, order="sequency", complementary=False, batch_size=None):
+    """
+    Separable Hadamard basis at the device resolution, one pattern per pixel,
+    e.g. 84 x 48 = 4032 patterns for the Nokia.
+
+    Pattern `(i, k)` is the outer product of rows `i` and `k` of the Hadamard
+    matrices of the device height and width, with +1 shown as 255 and -1 as 0.
+
+    Parameters
+    ----------
+    device_key : str
+        Option from `SLMDevices`.
+    order : "sequency" or "natural"
+        Order of the rows of each matrix, see `hadamard_matrix`. "sequency"
+        gives Walsh patterns for powers of 2.
+    complementary : bool
+        Follow each pattern by its complement, e.g. to measure the +1 and -1
+        parts separately.
+    batch_size : int, optional
+        Yield stacks of this many frames rather than single frames.
+
+    Yields
+    ------
+    mask : :py:class:`~numpy.ndarray`
+        ([N_frame,] [3,] N_height, N_width) uint8 mask(s) of 0 and 255, row
+        index `i` varying slowest.
+    """
+    height, width = slm_devices[device_key][SLMParam.SLM_SHAPE]
+    rows = hadamard_matrix(height, order) > 0
+    cols = hadamard_matrix(width, order) > 0
+    repeat = 2 if complementary else 1
+
+    def render(start, stop):
+        index = np.arange(start, stop)
+        i, k = np.divmod(index // repeat, width)
+        # +1 where the row and column signs agree
+        on = rows[i][:, :, np.newaxis] == cols[k][:, np.newaxis, :]
+        on ^= (index % repeat == 1)[:, np.newaxis, np.newaxis]
+        return np.where(on, np.uint8(255), np.uint8(0))
+
+    return _frames(device_key, repeat * height * width, render, batch_size)
+
+
+def speckle(device_key, n_frames, grain_size, seed=0, unit="m", batch_size=None):
+    """
+    Fully developed speckle intensity patterns, from random phases low-pass
+    filtered to the given grain size.
+
+    Frame `k` only depends on `seed` and `k`, whatever `batch_size`.
+
+    Parameters
+    ----------
+    device_key : str
+        Option from `SLMDevices`.
+    n_frames : int
+        Number of patterns.
+    grain_size : float
+        Approximate diameter of the speckle grains [m or px].
+    seed : int
+        Seed of the random phases.
+    unit : "m" or "px"
+        Unit of `grain_size`.
+    batch_size : int, optional
+        Yield stacks of this many frames rather than single frames.
+
+    Yields
+    ------
+    mask : :py:class:`~numpy.ndarray`
+        ([N_frame,] [3,] N_height, N_width) uint8 mask(s), intensity mapped to
+        [0, 255] with three times the mean intensity as full scale.
+    """
+    height, width = slm_devices[device_key][SLMParam.SLM_SHAPE]
+    pitch = slm_devices[device_key][SLMParam.PIXEL_PITCH] if unit == "m" else (1.0, 1.0)
+
+    # circular pupil in the Fourier plane, of radius 1 / grain size
+    fy = np.fft.fftfreq(height, d=pitch[0])[:, np.newaxis]
+    fx = np.fft.fftfreq(width, d=pitch[1])[np.newaxis, :]
+    pupil = (fx**2 + fy**2) <= (1 / grain_size) ** 2
+
+    def render(start, stop):
+        phases = np.stack(
+            [
+                np.random.default_rng([seed, k]).random((height, width), dtype=np.float32)
+                for k in range(start, stop)
+            ]
+        )
+        field = np.exp(1j * np.float32(_TWO_PI) * phases).astype(np.complex64)
+        field = np.fft.ifft2(np.fft.fft2(field) * pupil)
+        intensity = (field.real**2 + field.imag**2).astype(np.float32)
+        intensity /= np.float32(3) * intensity.mean(axis=(1, 2), keepdims=True)
+        np.minimum(intensity, 1, out=intensity)
+        return _to_uint8(intensity)
+
+    return _frames(device_key, n_frames, render, batch_size)
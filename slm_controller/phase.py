@@ -0,0 +1,286 @@
+"""
+Conversion of phase maps to the gray levels of a phase SLM, through
+calibration look-up tables.
+
+A :py:class:`PhaseLUT` holds the phase delay of every gray level of a device at
+a given wavelength, as measured or fitted, and a precomputed inverse table
+mapping wrapped phases to the gray level with the closest delay. LUTs are
+registered per device and wavelength with `register_lut`, and `phase_to_gray`
+converts stacks of phase maps in float32 with a single table lookup per pixel.
+"""
+
+import functools
+import os
+
+import numpy as np
+
+from slm_controller.hardware import SLMDevices, SLMParam, slm_devices
+
+_TWO_PI = 2 * np.pi
+
+# LUTs by (device key, wavelength)
+_luts = {}
+
+
+class PhaseLUT:
+    def __init__(self, phases, wavelength=None, resolution=4096):
+        """
+        Calibration of the phase delay of a phase SLM.
+
+        Parameters
+        ----------
+        phases : array_like
+            Phase delay [rad] of each gray level, from level 0 upwards.
+        wavelength : float, optional
+            Wavelength [m] of the calibration.
+        resolution : int
+            Number of bins over [0, 2 pi) of the inverse table. 4096 bins keep
+            the phase error from binning below 1 mrad.
+        """
+        phases = np.asarray(phases, dtype=np.float64)
+        assert phases.ndim == 1 and 2 <= len(phases) <= 256
+        self._phases = phases
+        self._phases.setflags(write=False)
+        self._wavelength = wavelength
+        self._resolution = resolution
+
+        # gray level whose delay is closest, modulo 2 pi, to the center of each bin
+        targets = np.arange(resolution) * (_TWO_PI / resolution)
+        distance = np.abs(np.angle(np.exp(1j * (targets[:, np.newaxis] - phases))))
+        self._table = np.argmin(distance, axis=1).astype(np.uint8)
+        self._table.setflags(write=False)
+
+    @classmethod
+    def linear(cls, n_levels=256, max_phase=_TWO_PI, wavelength=None, **kwargs):
+        """
+        LUT of an ideal device, whose delay grows linearly with the gray level.
+
+        Parameters
+        ----------
+        n_levels : int
+            Number of gray levels.
+        max_phase : float
+            Delay [rad] one level above the last, i.e. the last level has a delay
+            of `max_phase * (n_levels - 1) / n_levels`.
+        wavelength : float, optional
+            Wavelength [m].
+        """
+        phases = np.arange(n_levels) * (max_phase / n_levels)
+        return cls(phases, wavelength=wavelength, **kwargs)
+
+    @classmethod
+    def fit(cls, gray, phase, n_levels=256, wavelength=None, **kwargs):
+        """
+        LUT interpolated from phase measurements at some gray levels.
+
+        Parameters
+        ----------
+        gray : array_like
+            Measured gray levels, increasing.
+        phase : array_like
+            Unwrapped phase delay [rad] measured at each of `gray`.
+        n_levels : int
+            Number of gray levels of the device.
+        wavelength : float, optional
+            Wavelength [m] of the measurement.
+        """
+        gray = np.asarray(gray, dtype=np.float64)
+        phase = np.asarray(phase, dtype=np.float64)
+        phases = np.interp(np.arange(n_levels), gray, phase)
+        return cls(phases, wavelength=wavelength, **kwargs)
+
+    @classmethod
+    def load(cls, fname, wavelength=None, **kwargs):
+        """
+        Load a LUT from a `.npy` file of delays per gray level, or from a text
+        file with columns gray level and delay [rad], which is fitted.
+
+        Files are read once: loading the same unmodified file again returns the
+        same LUT.
+
+        Parameters
+        ----------
+        fname : str, path-like
+            Calibration file.
+        wavelength : float, optional
+            Wavelength [m] of the calibration.
+        """
+        fname = os.path.abspath(fname)
+        kwargs = tuple(sorted(kwargs.items()))
+        return _load_lut(cls, fname, os.path.getmtime(fname), wavelength, kwargs)
+
+    def save(self, fname):
+        """
+        Save the delays per gray level to a `.npy` file.
+        """
+        np.save(fname, self._phases)
+
+    @property
+    def phases(self):
+        return self._phases
+
+    @property
+    def wavelength(self):
+        return self._wavelength
+
+    @property
+    def n_levels(self):
+        return len(self._phases)
+
+    @property
+    def table(self):
+        """
+        Returns
+        -------
+        table : :py:class:`~numpy.ndarray`
+            (resolution,) gray level for each bin of wrapped phase.
+        """
+        return self._table
+
+    def at_wavelength(self, wavelength):
+        """
+        Rescale the LUT to another wavelength, the delay of a liquid crystal
+        being approximately inversely proportional to the wavelength.
+
+        Parameters
+        ----------
+        wavelength : float
+            Target wavelength [m].
+        """
+        assert self._wavelength is not None, "The LUT wavelength is unknown."
+        phases = self._phases * (self._wavelength / wavelength)
+        return type(self)(phases, wavelength=wavelength, resolution=self._resolution)
+
+    def __call__(self, phase, out=None, chunk_nbytes=2**24):
+        """
+        Convert phases to gray levels, see `phase_to_gray`.
+        """
+        return phase_to_gray(phase, lut=self, out=out, chunk_nbytes=chunk_nbytes)
+
+
+@functools.lru_cache(maxsize=32)
+def _load_lut(cls, fname, mtime, wavelength, kwargs):
+    if fname.endswith(".npy"):
+        return cls(np.load(fname), wavelength=wavelength, **dict(kwargs))
+    gray, phase = np.loadtxt(fname, delimiter="," if fname.endswith(".csv") else None).T
+    return cls.fit(gray, phase, wavelength=wavelength, **dict(kwargs))
+
+
+def register_lut(lut, device_key=SLMDevices.HOLOEYE_LC_2012.value, wavelength=None):
+    """
+    Register the calibration of a device at a wavelength, for `get_lut` and
+    `phase_to_gray`.
+
+    Parameters
+    ----------
+    lut : :py:class:`PhaseLUT`
+        Calibration.
+    device_key : str
+        Option from `SLMDevices`.
+    wavelength : float, optional
+        Wavelength [m], by default the LUT's.
+    """
+    assert device_key in SLMDevices.values()
+    if wavelength is None:
+        wavelength = lut.wavelength
+    _luts[device_key, wavelength] = lut
+
+
+def get_lut(device_key=SLMDevices.HOLOEYE_LC_2012.value, wavelength=None):
+    """
+    Calibration of a device at a wavelength.
+
+    Parameters
+    ----------
+    device_key : str
+        Option from `SLMDevices`.
+    wavelength : float, optional
+        Wavelength [m].
+
+    Returns
+    -------
+    lut : :py:class:`PhaseLUT`
+        LUT registered for the device and wavelength. Otherwise, the LUT
+        registered for the device at another wavelength, rescaled (and
+        registered for next time), or a linear LUT over the device's bit depth
+        if none was registered.
+    """
+    lut = _luts.get((device_key, wavelength))
+    if lut is not None:
+        return lut
+
+    if wavelength is not None:
+        known = [w for (key, w) in _luts if key == device_key and w is not None]
+        if known:
+            closest = min(known, key=lambda w: abs(w - wavelength))
+            lut = _luts[device_key, closest].at_wavelength(wavelength)
+    if lut is None:
+        assert device_key in SLMDevices.values()
+        bit_depth = np.min(slm_devices[device_key][SLMParam.BIT_DEPTH])
+        lut = PhaseLUT.linear(n_levels=2 ** int(bit_depth), wavelength=wavelength)
+    _luts[device_key, wavelength] = lut
+    return lut
+
+
+def phase_to_gray(
+    phase,
+    lut=None,
+    device_key=SLMDevices.HOLOEYE_LC_2012.value,
+    wavelength=None,
+    out=None,
+    chunk_nbytes=2**24,
+):
+    """
+    Convert phase maps to gray levels.
+
+    Phases are wrapped to [0, 2 pi), binned to the LUT resolution and looked
+    up, in float32 and chunks of `chunk_nbytes` at a time, whatever the shape
+    of `phase`, e.g. a (N_frame, N_height, N_width) stack.
+
+    Parameters
+    ----------
+    phase : :py:class:`~numpy.ndarray`
+        Phases [rad], any wrap.
+    lut : :py:class:`PhaseLUT`, optional
+        Calibration, by default `get_lut(device_key, wavelength)`.
+    device_key : str
+        Option from `SLMDevices`, if `lut` is not given.
+    wavelength : float, optional
+        Wavelength [m], if `lut` is not given.
+    out : :py:class:`~numpy.ndarray`, optional
+        uint8 array of the same shape as `phase` to write the result to.
+    chunk_nbytes : int
+        Approximate size of the working buffers [bytes].
+
+    Returns
+    -------
+    out : :py:class:`~numpy.ndarray`
+        Gray levels, same shape as `phase`, uint8.
+    """
+    if lut is None:
+        lut = get_lut(device_key, wavelength)
+
+    if out is None:
+        out = np.empty(phase.shape, dtype=np.uint8)
+    assert out.shape == phase.shape and out.dtype == np.uint8 and out.flags.c_contiguous
+
+    flat = phase.reshape(-1)
+    flat_out = out.reshape(-1)
+    resolution = len(lut.table)
+    scale = np.float32(resolution / _TWO_PI)
+
+    chunk = max(1, min(chunk_nbytes // 8, flat.size))
+    work = np.empty(chunk, dtype=np.float32)
+    index = np.empty(chunk, dtype=np.int64)
+    for start in range(0, flat.size, chunk):
+        stop = min(start + chunk, flat.size)
+        buf, idx = work[: stop - start], index[: stop - start]
+
+        # nearest bin, the lookup wraps it to [0, resolution)
+        np.multiply(flat[start:stop], scale, out=buf)
+        np.add(buf, np.float32(0.5), out=buf)
+        np.floor(buf, out=buf)
+        np.copyto(idx, buf, casting="unsafe")
+        np.take(lut.table, idx, out=flat_out[start:stop], mode="wrap")
+
+    return out
@@ -0,0 +1,111 @@
+"""
+Display-then-capture acquisition, overlapping the preparation of the next mask
+with the settling and capture of the current one.
+"""
+
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import CancelledError
+
+from slm_controller.playback import sleep_until
+
+CaptureRecord = namedtuple("CaptureRecord", ["index", "capture", "shown", "settled", "captured"])
+CaptureRecord.__doc__ = """
+Result of one display-then-capture step: index of the mask in the input
+sequence, value returned by the capture callable, and `time.perf_counter`
+timestamps at which the mask reached the SLM, the settle time ended and the
+capture returned.
+"""
+
+# sentinel closing the queue of prepared frames
+_END = object()
+
+
+def display_and_capture(device, masks, capture, settle_time=None, depth=2):
+    """
+    Show masks one after the other and capture a measurement for each, once
+    the SLM has settled.
+
+    While mask `k` settles and is captured, a background thread validates and
+    encodes the next masks (see `SLM.prepare`), so the device only waits for
+    the transfer itself.
+
+    Parameters
+    ----------
+    device : :py:class:`~slm_controller.slm.SLM`
+        SLM to show the masks on. `HoloeyeSLM` blocks for its show time after
+        each mask, which should then be set to 0 with `set_show_time`. The
+        settle time is counted from the end of the transfer, so that it
+        overlaps the show time.
+    masks : iterable(:py:class:`~numpy.ndarray`)
+        Masks accepted by `device.imshow`, consumed lazily.
+    capture : callable
+        Called without argument to grab a measurement, e.g. a camera frame.
+    settle_time : float, optional
+        Time [s] to wait between the end of the transfer and the capture, by
+        default the device's `settle_time`.
+    depth : int
+        Number of masks prepared ahead.
+
+    Yields
+    ------
+    record : :py:class:`CaptureRecord`
+        Index, capture and timestamps of each mask, in order.
+    """
+    assert depth >= 1
+    if settle_time is None:
+        settle_time = device.settle_time
+
+    prepared = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                prepared.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def prepare():
+        try:
+            for index, I in enumerate(masks):
+                if not put((index, device.prepare(I))):
+                    return
+            put(_END)
+        except BaseException as e:
+            put(e)
+
+    preparer = threading.Thread(target=prepare, name="slm-capture-prepare", daemon=True)
+    preparer.start()
+    try:
+        while True:
+            item = prepared.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            index, frame = item
+
+            device._transferred = None
+            future = device.show_prepared(frame)
+            try:
+                shown = future.result() if future is not None else time.perf_counter()
+            except CancelledError:
+                # superseded by a mask submitted outside the pipeline
+                shown = time.perf_counter()
+            if device._transferred is not None:
+                # e.g. before the show time of a Holoeye
+                shown = device._transferred
+
+            sleep_until(shown + settle_time)
+            settled = time.perf_counter()
+
+            result = capture()
+            yield CaptureRecord(index, result, shown, settled, time.perf_counter())
+    finally:
+        stop.set()
+        preparer.join()
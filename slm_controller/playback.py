@@ -0,0 +1,340 @@
+"""
+Frame-sequence playback paced against a monotonic clock.
+"""
+
+import time
+from dataclasses import dataclass, field
+
+# Below this many seconds before a deadline, busy-wait instead of sleeping, as
+# `time.sleep` typically overshoots by up to a scheduler tick.
+_SPIN_THRESHOLD = 2e-3
+
+
+@dataclass
+class PlaybackStats:
+    """
+    Summary of a playback run.
+
+    Attributes
+    ----------
+    fps : float or None
+        Target frame rate [Hz], None if frames were shown as fast as possible.
+    presented : int
+        Number of frames sent to the SLM.
+    dropped : list(int)
+        Indices of frames skipped because their time slot had already passed.
+    late : list(int)
+        Indices of frames whose presentation started after their deadline (plus
+        tolerance).
+    lateness : list(float)
+        Delay [s] between deadline and start of presentation, for every presented
+        frame.
+    duration : float
+        Wall-clock duration [s] of the run.
+    """
+
+    fps: float = None
+    presented: int = 0
+    dropped: list = field(default_factory=list)
+    late: list = field(default_factory=list)
+    lateness: list = field(default_factory=list)
+    duration: float = 0.0
+
+    @property
+    def achieved_fps(self):
+        """
+        Returns
+        -------
+        fps : float
+            Average presentation rate [Hz] over the run.
+        """
+        if self.duration <= 0:
+            return 0.0
+        return self.presented / self.duration
+
+
+@dataclass
+class BitPlaneStats:
+    """
+    Timing of a temporal bit-plane modulation run.
+
+    Attributes
+    ----------
+    n_bits : int
+        Number of bit planes.
+    base_time : float
+        Target display time [s] of the least significant plane, plane `k` being
+        shown for `base_time * 2**k`.
+    cycles : int
+        Number of complete cycles through the planes.
+    on_times : list(float)
+        Total time [s] each plane was on the display, from the end of its
+        transfer to the end of the next one.
+    transfer_times : list(float)
+        Mean transfer time [s] of each plane.
+    duration : float
+        Wall-clock duration [s] of the run.
+    """
+
+    n_bits: int = 0
+    base_time: float = 0.0
+    cycles: int = 0
+    on_times: list = field(default_factory=list)
+    transfer_times: list = field(default_factory=list)
+    duration: float = 0.0
+
+    @property
+    def cycle_rate(self):
+        """
+        Returns
+        -------
+        rate : float
+            Number of cycles per second [Hz].
+        """
+        if self.duration <= 0:
+            return 0.0
+        return self.cycles / self.duration
+
+    @property
+    def fractions(self):
+        """
+        Returns
+        -------
+        fractions : list(float)
+            Fraction of the time each plane was shown. Ideally `2**k / (2**n_bits
+            - 1)` for plane `k`.
+        """
+        total = sum(self.on_times)
+        if total <= 0:
+            return [0.0] * self.n_bits
+        return [t / total for t in self.on_times]
+
+    @property
+    def max_level_error(self):
+        """
+        Returns
+        -------
+        error : float
+            Largest deviation of a displayed gray level from its target, in
+            gray levels of `n_bits` bits, due to the plane timing.
+        """
+        levels = 2**self.n_bits - 1
+        ideal = [2**k / levels for k in range(self.n_bits)]
+        deviations = [f - i for f, i in zip(self.fractions, ideal)]
+        # a gray level is shown as the sum of the fractions of its planes, so the
+        # worst level gathers all the planes deviating in one direction
+        return levels * max(
+            sum(d for d in deviations if d > 0), -sum(d for d in deviations if d < 0)
+        )
+
+
+def cycle_bit_planes(show, n_bits, base_time, duration, clock=time.perf_counter):
+    """
+    Show bit planes one after the other, each for a time proportional to its
+    weight, for a given duration.
+
+    The next plane's transfer is started ahead of the end of the current
+    plane's slice by the last measured transfer time of that plane, so that the
+    on times follow the weights as long as `base_time` is at least the
+    transfer time.
+
+    Parameters
+    ----------
+    show : callable
+        Called with the index `k` of a plane to transfer it to the display.
+    n_bits : int
+        Number of planes, plane `k` having weight `2**k`.
+    base_time : float
+        Display time [s] of the least significant plane.
+    duration : float
+        Minimum duration [s] of the run, rounded up to complete cycles.
+    clock : callable
+        Monotonic clock returning seconds.
+
+    Returns
+    -------
+    stats : :py:class:`BitPlaneStats`
+        Cycles, per-plane on and transfer times of the run.
+    """
+    stats = BitPlaneStats(n_bits=n_bits, base_time=base_time)
+    on_times = [0.0] * n_bits
+    transfer_totals = [0.0] * n_bits
+    transfer_last = [0.0] * n_bits
+
+    start = clock()
+    previous, previous_end = None, None
+    while stats.cycles == 0 or clock() - start < duration:
+        for k in range(n_bits):
+            if previous is not None:
+                sleep_until(previous_end + base_time * 2**previous - transfer_last[k], clock)
+            t0 = clock()
+            show(k)
+            t1 = clock()
+
+            transfer_last[k] = t1 - t0
+            transfer_totals[k] += t1 - t0
+            if previous is not None:
+                on_times[previous] += t1 - previous_end
+            previous, previous_end = k, t1
+        stats.cycles += 1
+
+    # the last plane stays for its slice
+    sleep_until(previous_end + base_time * 2**previous, clock)
+    on_times[previous] += clock() - previous_end
+
+    stats.on_times = on_times
+    stats.transfer_times = [t / stats.cycles for t in transfer_totals]
+    stats.duration = clock() - start
+    return stats
+
+
+def sleep_until(deadline, clock=time.perf_counter):
+    """
+    Block until `clock()` reaches `deadline`.
+
+    Sleeps for the bulk of the interval and busy-waits for the last few
+    milliseconds to limit overshoot.
+
+    Parameters
+    ----------
+    deadline : float
+        Target time, in the time base of `clock`.
+    clock : callable
+        Monotonic clock returning seconds.
+    """
+    remaining = deadline - clock()
+    if remaining > _SPIN_THRESHOLD:
+        time.sleep(remaining - _SPIN_THRESHOLD)
+    while clock() < deadline:
+        pass
+
+
+def play(show, frames, fps=None, drop_late=True, late_tolerance=None, clock=time.perf_counter):
+    """
+    Present a sequence of frames at a target rate.
+
+    Frame `k` is due at `t_0 + k / fps`, where `t_0` is the time the first frame
+    is available. Pacing is done against the deadlines rather than by sleeping a
+    fixed amount after each frame, so per-frame overhead does not accumulate.
+
+    Parameters
+    ----------
+    show : callable
+        Called with each frame to present it, e.g. `SLM.imshow`.
+    frames : iterable
+        Frames to present. Generators are consumed lazily.
+    fps : float, optional
+        Target frame rate [Hz]. If None, frames are shown as fast as possible.
+    drop_late : bool
+        Skip frames whose time slot has entirely passed before they could be
+        shown, so that playback catches up instead of drifting.
+    late_tolerance : float, optional
+        Delay [s] after its deadline from which a presented frame is counted as
+        late, by default 10% of the frame period.
+    clock : callable
+        Monotonic clock returning seconds.
+
+    Returns
+    -------
+    stats : :py:class:`PlaybackStats`
+        Presented, dropped and late frames of the run.
+    """
+    if fps is not None and fps <= 0:
+        raise ValueError("Parameter[fps] must be positive.")
+
+    period = 1 / fps if fps else 0.0
+    if late_tolerance is None:
+        late_tolerance = 0.1 * period
+
+    stats = PlaybackStats(fps=fps)
+    start = None
+    for k, frame in enumerate(frames):
+        now = clock()
+        if start is None:
+            start = now
+        deadline = start + k * period
+
+        if period:
+            if drop_late and now >= deadline + period:
+                stats.dropped.append(k)
+                continue
+            sleep_until(deadline, clock)
+
+        lateness = clock() - deadline
+        show(frame)
+
+        stats.presented += 1
+        stats.lateness.append(lateness)
+        if period and lateness > late_tolerance:
+            stats.late.append(k)
+
+    if start is not None:
+        stats.duration = clock() - start
+    return stats
+
+
+async def aplay(show, frames, fps=None, drop_late=True, clock=time.perf_counter):
+    """
+    Present a sequence of frames at a target rate, without blocking the event
+    loop.
+
+    Asynchronous counterpart of :py:func:`play`, as an asynchronous iterator
+    yielding after each presented frame. Waiting is done with `asyncio.sleep`,
+    which typically overshoots by about a millisecond.
+
+    Parameters
+    ----------
+    show : coroutine function
+        Awaited with each frame to present it, e.g. `SLM.aimshow`.
+    frames : iterable or asynchronous iterable
+        Frames to present, consumed lazily.
+    fps : float, optional
+        Target frame rate [Hz]. If None, frames are shown as fast as possible.
+    drop_late : bool
+        Skip frames whose time slot has entirely passed before they could be
+        shown.
+    clock : callable
+        Monotonic clock returning seconds.
+
+    Yields
+    ------
+    index : int
+        Index of the presented frame in `frames`.
+    lateness : float
+        Delay [s] between the frame's deadline and the start of its
+        presentation.
+    """
+    # imported here, as it noticeably slows down the import of this module
+    import asyncio
+
+    if fps is not None and fps <= 0:
+        raise ValueError("Parameter[fps] must be positive.")
+
+    period = 1 / fps if fps else 0.0
+
+    if not hasattr(frames, "__aiter__"):
+        frames = _aiter(frames)
+
+    start = None
+    k = 0
+    async for frame in frames:
+        now = clock()
+        if start is None:
+            start = now
+        deadline = start + k * period
+        k += 1
+
+        if period:
+            if drop_late and now >= deadline + period:
+                continue
+            if deadline > now:
+                await asyncio.sleep(deadline - now)
+
+        lateness = clock() - deadline
+        await show(frame)
+        yield k - 1, lateness
+
+
+async def _aiter(frames):
+    for frame in frames:
+        yield frame
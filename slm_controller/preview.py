@@ -0,0 +1,302 @@
+"""
+Destinations for mask previews.
+
+A sink receives every previewed mask through `update`, and only renders it if
+its `max_rate` allows, so that previewing does not slow down a sequence shown
+at the device rate. Masks are ([3,] N_height, N_width) uint8 arrays, the
+optional 0-th dimension holding RGB channels.
+"""
+
+import collections
+import os
+import time
+
+import numpy as np
+
+
+class PreviewSink:
+    def __init__(self, max_rate=None):
+        """
+        Base class of preview destinations.
+
+        Parameters
+        ----------
+        max_rate : float, optional
+            Maximum number of previews rendered per second [Hz], by default no
+            limit. Masks arriving less than `1 / max_rate` after the previous
+            render ended are skipped, the latest one being rendered by `flush`
+            unless a newer one is rendered first.
+        """
+        self._min_interval = 1 / max_rate if max_rate else 0.0
+        self._last_render = None
+        # copy of the latest mask skipped by the rate limit, see `flush`
+        self._skipped = None
+        self._has_skipped = False
+
+    def update(self, I):
+        """
+        Preview a mask, unless the previous one was rendered too recently.
+
+        Parameters
+        ----------
+        I : :py:class:`~numpy.ndarray`
+            ([3,] N_height, N_width) mask.
+
+        Returns
+        -------
+        rendered : bool
+            Whether the mask was rendered.
+        """
+        if not self._ready():
+            # kept, as it may be the last mask of a sequence
+            if self._skipped is None or self._skipped.shape != I.shape:
+                self._skipped = np.empty_like(I)
+            np.copyto(self._skipped, I)
+            self._has_skipped = True
+            return False
+        self._has_skipped = False
+        self._render_timed(I)
+        return True
+
+    def flush(self):
+        """
+        Render the latest mask skipped by the rate limit, if no newer mask was
+        rendered since, so that the preview shows the last mask, e.g. at the
+        end of a sequence.
+        """
+        if self._has_skipped:
+            self._has_skipped = False
+            self._render_timed(self._skipped)
+
+    def _ready(self):
+        return (
+            self._last_render is None
+            or time.perf_counter() - self._last_render >= self._min_interval
+        )
+
+    def _render_timed(self, I):
+        self._render(I)
+        # counted from the end of rendering, so that slow renders are skipped more
+        self._last_render = time.perf_counter()
+
+    def _render(self, I):
+        """
+        Render a mask.
+        """
+        raise NotImplementedError
+
+    def wait(self, timeout=None):
+        """
+        Keep the preview visible.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Time to wait [s]. Headless sinks return immediately if None.
+        """
+        self.flush()
+        if timeout is not None:
+            time.sleep(timeout)
+
+    @property
+    def is_open(self):
+        """
+        Returns
+        -------
+        is_open : bool
+            Whether the preview is shown in a window that the user has not
+            closed yet. Always False for headless sinks.
+        """
+        return False
+
+    def refresh(self):
+        """
+        Process pending GUI events without blocking, e.g. between the sleeps of
+        an event loop, so that a window stays responsive. A mask skipped by the
+        rate limit is rendered if the limit now allows it.
+        """
+        if self._has_skipped and self._ready():
+            self.flush()
+
+    def close(self):
+        """
+        Render the latest skipped mask, if any, and release the resources of
+        the sink.
+        """
+        self.flush()
+
+
+def _channels_last(I):
+    # RGB masks are channel first, images are channel last
+    return I.transpose(1, 2, 0) if I.ndim == 3 else I
+
+
+class WindowPreview(PreviewSink):
+    def __init__(self, title=None, max_rate=30.0):
+        """
+        Matplotlib window updated in place with each mask.
+
+        The window is opened with the first mask and reopened if it was closed.
+        Updating it does not block: the window stays responsive as long as
+        masks are previewed, or while `wait` is running.
+
+        Parameters
+        ----------
+        title : str, optional
+            Window title, followed by the figure number so that windows of
+            equal titles can be told apart.
+        max_rate : float, optional
+            Maximum number of redraws per second [Hz].
+        """
+        super().__init__(max_rate=max_rate)
+        self._title = title
+        self._fig = None
+        self._image = None
+
+    def _render(self, I):
+        import matplotlib.pyplot as plt
+
+        I = _channels_last(I)
+        if (
+            self._fig is None
+            or not plt.fignum_exists(self._fig.number)
+            or self._image.get_array().shape != I.shape
+        ):
+            self._close_figure()
+            # a new figure number rather than the title, which previews of
+            # several devices of one class share
+            self._fig, ax = plt.subplots()
+            if self._title is not None:
+                self._fig.canvas.manager.set_window_title(f"{self._title} ({self._fig.number})")
+            self._image = ax.imshow(I, cmap="gray", vmin=0, vmax=255)
+            plt.show(block=False)
+        else:
+            self._image.set_data(I)
+            self._fig.canvas.draw_idle()
+        self._fig.canvas.flush_events()
+
+    def wait(self, timeout=None):
+        """
+        Keep the window responsive.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Time to wait [s], by default until the window is closed.
+        """
+        self.flush()
+        if self._fig is None:
+            return
+
+        import matplotlib.pyplot as plt
+
+        if not plt.fignum_exists(self._fig.number):
+            return
+        if timeout is None:
+            plt.show(block=True)
+        else:
+            plt.pause(timeout)
+
+    @property
+    def is_open(self):
+        if self._fig is None:
+            return False
+
+        import matplotlib.pyplot as plt
+
+        return plt.fignum_exists(self._fig.number)
+
+    def refresh(self):
+        super().refresh()
+        if self.is_open:
+            self._fig.canvas.flush_events()
+
+    def close(self):
+        # a mask rendered now would not be seen
+        self._has_skipped = False
+        self._close_figure()
+
+    def _close_figure(self):
+        if self._fig is not None:
+            import matplotlib.pyplot as plt
+
+            plt.close(self._fig)
+            self._fig = None
+            self._image = None
+
+
+class PNGSequencePreview(PreviewSink):
+    def __init__(self, directory, prefix="preview_", max_rate=None):
+        """
+        Write previews as numbered PNG files, e.g. on machines without display.
+
+        Parameters
+        ----------
+        directory : str, path-like
+            Directory of the files, created if needed.
+        prefix : str
+            Start of the file names, followed by a 6-digit index.
+        max_rate : float, optional
+            Maximum number of files written per second [Hz].
+        """
+        super().__init__(max_rate=max_rate)
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._prefix = prefix
+        self._index = 0
+
+    @property
+    def n_written(self):
+        return self._index
+
+    def _render(self, I):
+        from PIL import Image
+
+        fname = os.path.join(self._directory, f"{self._prefix}{self._index:06d}.png")
+        Image.fromarray(_channels_last(I)).save(fname)
+        self._index += 1
+
+
+class RingPreview(PreviewSink):
+    def __init__(self, maxlen=64, max_rate=None):
+        """
+        Keep copies of the latest previews in memory, e.g. to inspect them in
+        tests or to serve them.
+
+        Parameters
+        ----------
+        maxlen : int
+            Number of previews kept.
+        max_rate : float, optional
+            Maximum number of previews stored per second [Hz].
+        """
+        super().__init__(max_rate=max_rate)
+        self._frames = collections.deque(maxlen=maxlen)
+
+    @property
+    def frames(self):
+        """
+        Returns
+        -------
+        frames : list(tuple)
+            (`time.perf_counter` timestamp, mask) of the kept previews, oldest
+            first.
+        """
+        return list(self._frames)
+
+    @property
+    def latest(self):
+        """
+        Returns
+        -------
+        I : :py:class:`~numpy.ndarray` or None
+            Latest previewed mask, None if none yet.
+        """
+        return self._frames[-1][1] if self._frames else None
+
+    def _render(self, I):
+        self._frames.append((time.perf_counter(), I.copy()))
+
+    def close(self):
+        self._has_skipped = False
+        self._frames.clear()
@@ -0,0 +1,245 @@
+"""
+Reusable plans to resize images to a device resolution.
+
+`utils.load_image` computes the scaling and crop of every image with PIL. When
+many images share the same resolution, a :py:class:`ResamplePlan` computes the
+crop window and the bicubic interpolation weights once, as one matrix per axis,
+and applies them with two matrix products to single images or whole stacks.
+The geometry is that of `load_image`, and the filter that of PIL's bicubic
+resize. Downsampled results agree with it within a few gray levels. When
+upsampling 8-bit images, PIL clips the intermediate result of its first pass to
+8 bits while plans keep it in float32, so that overshooting edges of
+high-contrast content differ by tens of gray levels, e.g. up to 10-30 on
+checkerboards and noise; smooth content still agrees within a gray level.
+"""
+
+import functools
+
+import numpy as np
+
+# ITU-R 601-2 luma transform, as used by PIL to convert RGB to grayscale
+_LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def _bicubic(x, a=-0.5):
+    x = np.abs(x)
+    return np.where(
+        x < 1,
+        ((a + 2) * x - (a + 3)) * x * x + 1,
+        np.where(x < 2, (((x - 5) * x + 8) * x - 4) * a, 0.0),
+    )
+
+
+def _weights(in_size, scaled_size, start, stop):
+    """
+    Bicubic interpolation weights from `in_size` input pixels to pixels
+    [start, stop) of an image resized to `scaled_size`, as computed by PIL.
+
+    Returns
+    -------
+    weights : :py:class:`~numpy.ndarray`
+        (stop - start, in_size) float32 interpolation matrix.
+    """
+    scale = in_size / scaled_size
+    filter_scale = max(scale, 1.0)
+    support = 2 * filter_scale
+
+    center = (np.arange(start, stop) + 0.5) * scale
+    first = np.maximum((center - support + 0.5).astype(int), 0)
+    last = np.minimum((center + support + 0.5).astype(int), in_size)
+    n_taps = int((last - first).max())
+
+    index = first[:, np.newaxis] + np.arange(n_taps)
+    valid = index < last[:, np.newaxis]
+    weight = _bicubic((index - center[:, np.newaxis] + 0.5) / filter_scale)
+    weight = np.where(valid, weight, 0.0)
+    weight /= weight.sum(axis=1, keepdims=True)
+
+    weights = np.zeros((stop - start, in_size), dtype=np.float32)
+    rows = np.broadcast_to(np.arange(stop - start)[:, np.newaxis], index.shape)
+    np.add.at(weights, (rows[valid], index[valid]), weight[valid])
+    return weights
+
+
+class ResamplePlan:
+    def __init__(
+        self,
+        source_shape,
+        output_shape,
+        keep_aspect_ratio=True,
+        grayscale=False,
+        chunk_nbytes=2**26,
+    ):
+        """
+        Precomputed resize of images of one resolution, see `get_plan` to reuse
+        plans.
+
+        Parameters
+        ----------
+        source_shape : tuple(int)
+            ([N_channel,] N_height, N_width) of the input images.
+        output_shape : tuple(int)
+            (height, width) of the output images.
+        keep_aspect_ratio : bool
+            Scale to cover the output and crop the center, as `load_image`,
+            rather than stretch.
+        grayscale : bool
+            Convert RGB inputs to grayscale.
+        chunk_nbytes : int
+            Approximate size of the float32 working buffers [bytes].
+        """
+        self._source_shape = tuple(source_shape)
+        self._grayscale = grayscale and len(source_shape) == 3
+        in_height, in_width = self._source_shape[-2:]
+        height, width = output_shape
+
+        if keep_aspect_ratio:
+            if width / height < in_width / in_height:
+                scaled_width = in_width * height // in_height
+                scaled_height = height
+            else:
+                scaled_width = width
+                scaled_height = in_height * width // in_width
+            x = scaled_width // 2 - width // 2
+            y = scaled_height // 2 - height // 2
+        else:
+            scaled_height, scaled_width = height, width
+            x = y = 0
+
+        # weights of the output pixels only, i.e. of the crop of the scaled image
+        self._rows = _weights(in_height, scaled_height, y, y + height)
+        self._cols_t = np.ascontiguousarray(_weights(in_width, scaled_width, x, x + width).T)
+
+        # multiply along the axis whose product is cheaper first
+        rows_first = height * in_height * in_width + height * in_width * width
+        cols_first = in_height * in_width * width + height * in_height * width
+        self._rows_first = rows_first <= cols_first
+
+        n_pixels = in_height * in_width * (1 if self._grayscale else np.prod(source_shape[:-2]))
+        self._chunk = max(1, chunk_nbytes // (4 * int(n_pixels)))
+
+        if self._grayscale or len(source_shape) == 2:
+            self._output_shape = (height, width)
+        else:
+            self._output_shape = (source_shape[0], height, width)
+
+    @property
+    def source_shape(self):
+        return self._source_shape
+
+    @property
+    def output_shape(self):
+        return self._output_shape
+
+    def __call__(self, I, out=None):
+        return self.apply(I, out=out)
+
+    def apply(self, I, out=None):
+        """
+        Resize an image or a stack of images.
+
+        Parameters
+        ----------
+        I : :py:class:`~numpy.ndarray`
+            ([N_image,] *source_shape) image(s).
+        out : :py:class:`~numpy.ndarray`, optional
+            ([N_image,] *output_shape) array to write the result to.
+
+        Returns
+        -------
+        out : :py:class:`~numpy.ndarray`
+            Resized image(s). uint8 inputs give rounded uint8 outputs, other
+            inputs float32 outputs.
+        """
+        stack = I.shape != self._source_shape
+        if stack:
+            assert I.shape[1:] == self._source_shape, (
+                f"Parameter[I]: shape {I.shape} does not match the plan source shape "
+                f"{self._source_shape}."
+            )
+        frames = I if stack else I[np.newaxis]
+
+        out_shape = (len(frames), *self._output_shape) if stack else self._output_shape
+        if out is None:
+            out = np.empty(out_shape, dtype=np.uint8 if I.dtype == np.uint8 else np.float32)
+        assert out.shape == out_shape
+        out_frames = out if stack else out[np.newaxis]
+
+        for start in range(0, len(frames), self._chunk):
+            stop = min(start + self._chunk, len(frames))
+            if self._grayscale:
+                # the luma transform is linear, so it is applied first, on the most pixels
+                chunk = np.einsum(
+                    "nchw,c->nhw",
+                    frames[start:stop, :3],
+                    _LUMA,
+                    dtype=np.float32,
+                    casting="same_kind",
+                )
+            else:
+                chunk = frames[start:stop].astype(np.float32, copy=False)
+
+            if self._rows_first:
+                res = np.matmul(np.matmul(self._rows, chunk), self._cols_t)
+            else:
+                res = np.matmul(self._rows, np.matmul(chunk, self._cols_t))
+
+            if out.dtype == np.uint8:
+                np.rint(res, out=res)
+                np.clip(res, 0, 255, out=res)
+            np.copyto(out_frames[start:stop], res, casting="unsafe")
+        return out
+
+
+@functools.lru_cache(maxsize=64)
+def get_plan(source_shape, output_shape, keep_aspect_ratio=True, grayscale=False):
+    """
+    Resample plan for the given shapes and options, created once and reused.
+
+    Parameters
+    ----------
+    source_shape : tuple(int)
+        ([N_channel,] N_height, N_width) of the input images.
+    output_shape : tuple(int)
+        (height, width) of the output images, e.g. a device's `SLM_SHAPE`.
+    keep_aspect_ratio : bool
+        Scale to cover the output and crop the center, rather than stretch.
+    grayscale : bool
+        Convert RGB inputs to grayscale.
+
+    Returns
+    -------
+    plan : :py:class:`ResamplePlan`
+        Plan shared by all callers with the same arguments.
+    """
+    return ResamplePlan(tuple(source_shape), tuple(output_shape), keep_aspect_ratio, grayscale)
+
+
+def resize(I, output_shape, keep_aspect_ratio=True, grayscale=False, stack=False, out=None):
+    """
+    Resize an image or a stack of images of the same resolution, through a
+    cached :py:class:`ResamplePlan`.
+
+    Parameters
+    ----------
+    I : :py:class:`~numpy.ndarray`
+        ([N_image,] [N_channel,] N_height, N_width) image(s).
+    output_shape : tuple(int)
+        (height, width) of the output images.
+    keep_aspect_ratio : bool
+        Scale to cover the output and crop the center, rather than stretch.
+    grayscale : bool
+        Convert RGB inputs to grayscale.
+    stack : bool
+        Whether the first dimension of `I` indexes images.
+    out : :py:class:`~numpy.ndarray`, optional
+        Array to write the result to.
+
+    Returns
+    -------
+    out : :py:class:`~numpy.ndarray`
+        Resized image(s), see `ResamplePlan.apply`.
+    """
+    source_shape = I.shape[1:] if stack else I.shape
+    plan = get_plan(source_shape, tuple(output_shape), keep_aspect_ratio, grayscale)
+    return plan.apply(I, out=out)
@@ -0,0 +1,280 @@
+"""
+On-disk format for long mask sequences, read back through memory mapping.
+
+A sequence file starts with the magic string `SLMSEQ01`, followed by the length
+of a JSON header as a little-endian uint32 and the header itself, recording the
+device key, frame shape, dtype and nominal frame rate. The header is padded so
+that the frames, stored back to back in C order, start at a multiple of 64
+bytes. The number of frames follows from the file size, so a sequence whose
+writing was interrupted remains readable up to its last complete frame.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+
+import numpy as np
+
+from slm_controller.hardware import SLMDevices, SLMParam, slm_devices
+
+MAGIC = b"SLMSEQ01"
+_ALIGNMENT = 64
+
+
+class SequenceWriter:
+    def __init__(self, fname, device_key, frame_shape=None, dtype=np.uint8, frame_rate=None):
+        """
+        Write masks one by one to a sequence file.
+
+        Parameters
+        ----------
+        fname : str, path-like
+            File to create, overwritten if it exists.
+        device_key : str
+            Option from `SLMDevices` the masks are meant for.
+        frame_shape : tuple(int), optional
+            ([N_channel,] N_height, N_width) of the masks, by default the
+            device's `SLM_SHAPE`.
+        dtype : dtype
+            Data type of the masks.
+        frame_rate : float, optional
+            Nominal frame rate [Hz] of the sequence, by default the device's
+            `FRAME_RATE` if it declares one.
+        """
+        assert device_key in SLMDevices.values()
+
+        device_shape = slm_devices[device_key][SLMParam.SLM_SHAPE]
+        if frame_shape is None:
+            frame_shape = device_shape
+        if tuple(frame_shape[-2:]) != tuple(device_shape):
+            raise ValueError(
+                f"Parameter[frame_shape]: {frame_shape} does not match the {device_key} SLM shape "
+                f"{device_shape}."
+            )
+        if frame_rate is None:
+            frame_rate = slm_devices[device_key].get(SLMParam.FRAME_RATE)
+
+        self._frame_shape = tuple(int(n) for n in frame_shape)
+        self._dtype = np.dtype(dtype)
+        self._n_frames = 0
+
+        header = {
+            "device": device_key,
+            "frame_shape": self._frame_shape,
+            "dtype": self._dtype.str,
+            "frame_rate": frame_rate,
+        }
+        header = json.dumps(header).encode("utf-8")
+        prefix_len = len(MAGIC) + 4
+        header += b" " * (-(prefix_len + len(header)) % _ALIGNMENT)
+
+        self._file = open(fname, "wb")
+        self._file.write(MAGIC)
+        self._file.write(struct.pack("<I", len(header)))
+        self._file.write(header)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self._n_frames
+
+    def write(self, frame):
+        """
+        Append a mask to the sequence.
+
+        Parameters
+        ----------
+        frame : :py:class:`~numpy.ndarray`
+            Mask of the sequence's frame shape. It is cast to the sequence's
+            dtype if needed.
+        """
+        if frame.shape != self._frame_shape:
+            raise ValueError(
+                f"Parameter[frame]: shape {frame.shape} does not match {self._frame_shape}."
+            )
+        frame = np.ascontiguousarray(frame, dtype=self._dtype)
+        self._file.write(frame.data)
+        self._n_frames += 1
+
+    def write_frames(self, frames):
+        """
+        Append masks to the sequence.
+
+        Parameters
+        ----------
+        frames : iterable(:py:class:`~numpy.ndarray`)
+            Masks, e.g. a stack of shape (N_frame, *frame_shape) or a generator.
+        """
+        for frame in frames:
+            self.write(frame)
+
+    def close(self):
+        """
+        Flush and close the file.
+        """
+        self._file.close()
+
+
+class SequenceReader:
+    def __init__(self, fname, readahead=4):
+        """
+        Memory-mapped view of a sequence file.
+
+        Frames are read from disk only when accessed, so sequences larger than
+        the available memory can be displayed. Iterating over the reader yields
+        zero-copy views of the frames, while a background thread reads the next
+        `readahead` frames ahead of the consumer.
+
+        Parameters
+        ----------
+        fname : str, path-like
+            Sequence file written with :py:class:`SequenceWriter`.
+        readahead : int
+            Number of frames to read ahead when iterating, 0 to disable.
+        """
+        with open(fname, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{fname} is not an SLM sequence file.")
+            (header_len,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_len).decode("utf-8"))
+
+        self._device_key = header["device"]
+        self._frame_shape = tuple(header["frame_shape"])
+        self._dtype = np.dtype(header["dtype"])
+        self._frame_rate = header["frame_rate"]
+        self._readahead = readahead
+
+        offset = len(MAGIC) + 4 + header_len
+        frame_nbytes = self._dtype.itemsize * int(np.prod(self._frame_shape))
+        n_frames = (os.path.getsize(fname) - offset) // frame_nbytes
+        if n_frames > 0:
+            self._frames = np.memmap(
+                fname,
+                dtype=self._dtype,
+                mode="r",
+                offset=offset,
+                shape=(n_frames, *self._frame_shape),
+            )
+        else:
+            self._frames = np.empty((0, *self._frame_shape), dtype=self._dtype)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self._frames)
+
+    def __getitem__(self, index):
+        return self._frames[index]
+
+    def __iter__(self):
+        return self.iter_frames()
+
+    @property
+    def device_key(self):
+        return self._device_key
+
+    @property
+    def frame_shape(self):
+        return self._frame_shape
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    @property
+    def frame_rate(self):
+        return self._frame_rate
+
+    @property
+    def frames(self):
+        """
+        Returns
+        -------
+        frames : :py:class:`~numpy.memmap`
+            (N_frame, *frame_shape) memory-mapped frames.
+        """
+        return self._frames
+
+    def iter_frames(self, start=0, stop=None):
+        """
+        Iterate over frames, reading ahead in a background thread.
+
+        Parameters
+        ----------
+        start : int
+            Index of the first frame.
+        stop : int, optional
+            Index after the last frame, by default the end of the sequence.
+
+        Yields
+        ------
+        frame : :py:class:`~numpy.ndarray`
+            Read-only view of the frame in the memory map.
+        """
+        stop = len(self._frames) if stop is None else min(stop, len(self._frames))
+        if self._readahead <= 0:
+            for index in range(start, stop):
+                yield self._frames[index]
+            return
+
+        prefetcher = _ReadAhead(self._frames, start, stop, self._readahead)
+        prefetcher.start()
+        try:
+            for index in range(start, stop):
+                prefetcher.advance(index)
+                yield self._frames[index]
+        finally:
+            prefetcher.stop()
+
+    def close(self):
+        """
+        Release the memory map. Frames obtained from the reader keep it alive.
+        """
+        self._frames = np.empty((0, *self._frame_shape), dtype=self._dtype)
+
+
+class _ReadAhead(threading.Thread):
+    def __init__(self, frames, start, stop, depth):
+        """
+        Thread touching every page of the frames ahead of the consumer, so that
+        they are in the page cache by the time they are displayed.
+        """
+        super().__init__(name="slm-sequence-readahead", daemon=True)
+        self._frames = frames
+        self._next = start
+        self._end = stop
+        self._depth = depth
+        self._position = start
+        self._stopped = False
+        self._cond = threading.Condition()
+
+    def advance(self, index):
+        with self._cond:
+            self._position = index
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def run(self):
+        while True:
+            with self._cond:
+                while not self._stopped and self._next > self._position + self._depth:
+                    self._cond.wait()
+                if self._stopped or self._next >= self._end:
+                    return
+            # reading one byte per page is enough to fault the whole frame in
+            self._frames[self._next].reshape(-1).view(np.uint8)[:: mmap.PAGESIZE].max()
+            self._next += 1
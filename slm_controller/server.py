@@ -0,0 +1,492 @@
+"""
+Frame server owning an SLM, so that other local processes can drive it without
+initializing the device themselves.
+
+A :py:class:`FrameServer` opens a device once and listens for local clients.
+Each client gets a ring of frame slots in shared memory
+(`multiprocessing.shared_memory`): frames are written into a slot, possibly
+generated there directly (see `SLMProxy.buffer`), and only the slot index goes
+through the control channel, so that frames are neither copied by the server
+nor pickled. Calls of all clients are serialized on the device.
+
+    slm-server nokia --simulate            # in one process
+
+    from slm_controller import server      # in others
+    with server.connect() as s:
+        s.imshow(mask)
+
+Control messages are pickled, so that whoever can connect can run code as the
+server. By default, the server therefore listens on a Unix socket in a
+directory only its user can access, see `default_address`. TCP addresses, e.g.
+on Windows, require an `authkey`, which clients must present.
+"""
+
+import argparse
+import collections
+import os
+import socket
+import stat
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import shared_memory
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+# TCP address on platforms without Unix sockets
+DEFAULT_TCP_ADDRESS = ("localhost", 50621)
+
+# shared memory blocks created by servers of this process
+_served = set()
+
+
+def _attach(name):
+    """
+    Attach to a shared memory block created by another process, without the
+    resource tracker of this process unlinking it when this process exits.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == "posix" and name not in _served:
+            from multiprocessing import resource_tracker
+
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def default_address():
+    """
+    Address servers listen on and clients connect to by default.
+
+    Returns
+    -------
+    address : str or tuple
+        Path of a Unix socket in a directory private to the current user, or
+        `DEFAULT_TCP_ADDRESS` where Unix sockets are not available.
+    """
+    if not hasattr(socket, "AF_UNIX") or os.name != "posix":
+        return DEFAULT_TCP_ADDRESS
+    return os.path.join(tempfile.gettempdir(), f"slm-server-{os.getuid()}", "socket")
+
+
+def _private_directory(path):
+    """
+    Create the directory of a socket, accessible by the current user only, or
+    check that an existing one is.
+    """
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError(
+            f"{path} must be a directory owned and only accessible by the current user."
+        )
+
+
+def _remove_stale_socket(path):
+    """
+    Remove the socket of a server that did not shut down, if no server listens
+    on it anymore.
+    """
+    if not os.path.exists(path):
+        return
+    with socket.socket(socket.AF_UNIX) as sock:
+        try:
+            sock.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+            return
+    raise OSError(f"A server is already listening on {path}.")
+
+
+def _slots(shm, n_slots, shape):
+    frames = np.ndarray((n_slots, *shape), dtype=np.uint8, buffer=shm.buf)
+    return list(frames)
+
+
+class FrameServer:
+    def __init__(self, device, device_key=None, address=None, authkey=None, n_slots=2):
+        """
+        Serve an SLM to local clients.
+
+        Parameters
+        ----------
+        device : :py:class:`~slm_controller.slm.SLM`
+            Device to serve, e.g. from `slm.create`. The server owns it from
+            then on.
+        device_key : str, optional
+            Key of the device, passed on to clients. The layout of the masks is
+            taken from the device's `mask_shape`.
+        address : tuple or str, optional
+            (host, port) or Unix socket path to listen on, by default
+            `default_address()`. The directory of a socket should only be
+            accessible by trusted users.
+        authkey : bytes, optional
+            Key clients must present to connect, required for TCP addresses as
+            anyone able to connect can run code as the server.
+        n_slots : int
+            Number of frame slots of each client. Two slots let a client fill
+            one while the other is shown.
+        """
+        assert n_slots >= 1
+        if address is None:
+            address = default_address()
+            if isinstance(address, str):
+                _private_directory(os.path.dirname(address))
+                _remove_stale_socket(address)
+        if isinstance(address, tuple) and not authkey:
+            raise ValueError("Parameter[authkey]: required to listen on a TCP address.")
+
+        self._device = device
+        self._device_key = device_key
+        self._shape = tuple(device.mask_shape)
+        self._n_slots = n_slots
+        self._authkey = authkey
+        self._listener = Listener(address, authkey=authkey)
+
+        # device calls of the clients, one at a time
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._handlers = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    @property
+    def address(self):
+        return self._listener.address
+
+    @property
+    def device(self):
+        return self._device
+
+    def start(self):
+        """
+        Serve clients from a background thread.
+        """
+        assert self._thread is None, "Server already started."
+        self._thread = threading.Thread(target=self.serve_forever, name="slm-server", daemon=True)
+        self._thread.start()
+
+    def serve_forever(self):
+        """
+        Accept clients until `shutdown`, each being served by its own thread.
+        """
+        while not self._stop.is_set():
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                if self._stop.is_set():
+                    break
+                raise
+            except Exception:
+                # e.g. a client presenting the wrong key
+                continue
+            if self._stop.is_set():
+                conn.close()
+                break
+
+            handler = threading.Thread(
+                target=self._serve_client, args=(conn,), name="slm-server-client", daemon=True
+            )
+            handler.start()
+            self._handlers.append(handler)
+
+    def shutdown(self):
+        """
+        Stop accepting clients, disconnect the connected ones once their
+        current call returns, and release the listener. The device is left
+        open.
+        """
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._thread is not None:
+            # wake up the accept call
+            try:
+                Client(self._listener.address, authkey=self._authkey).close()
+            except OSError:
+                pass
+            self._thread.join()
+        self._listener.close()
+        for handler in self._handlers:
+            handler.join()
+
+    def _serve_client(self, conn):
+        frame_nbytes = int(np.prod(self._shape))
+        shm = shared_memory.SharedMemory(create=True, size=self._n_slots * frame_nbytes)
+        slots = _slots(shm, self._n_slots, self._shape)
+        _served.add(shm.name)
+        try:
+            conn.send(
+                {
+                    "shm": shm.name,
+                    "n_slots": self._n_slots,
+                    "shape": self._shape,
+                    "device": self._device_key,
+                    "frame_rate": self._device.frame_rate,
+                }
+            )
+            while not self._stop.is_set():
+                try:
+                    if not conn.poll(0.1):
+                        continue
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    break
+                command = message[0]
+                if command == "close":
+                    break
+
+                try:
+                    with self._lock:
+                        if command == "imshow":
+                            future = self._device.imshow(slots[message[1]])
+                        elif command == "clear":
+                            future = self._device.clear()
+                        else:
+                            raise ValueError(f"Unknown command: {command}.")
+                        presented = future.result() if future is not None else time.perf_counter()
+                    conn.send(("ok", presented))
+                except Exception as e:
+                    try:
+                        conn.send(("error", e))
+                    except Exception:
+                        # not picklable
+                        conn.send(("error", RuntimeError(repr(e))))
+        finally:
+            del slots
+            conn.close()
+            shm.close()
+            shm.unlink()
+            _served.discard(shm.name)
+
+
+class SLMProxy:
+    def __init__(self, address=None, authkey=None, asynchronous=False):
+        """
+        Client of a :py:class:`FrameServer`, with the display interface of an
+        SLM. See `connect`.
+        """
+        if address is None:
+            address = default_address()
+        self._conn = Client(address, authkey=authkey)
+        info = self._conn.recv()
+        self._shape = tuple(info["shape"])
+        self._device_key = info["device"]
+        self._frame_rate = info["frame_rate"]
+        self._asynchronous = asynchronous
+
+        self._shm = _attach(info["shm"])
+        self._slots = _slots(self._shm, info["n_slots"], self._shape)
+        self._next = 0
+        # slots sent to the server and not acknowledged yet, oldest first
+        self._pending = collections.deque()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def shape(self):
+        """
+        Returns
+        -------
+        sh : tuple(int)
+            (N_height, N_width) SLM dimensions [pixels]
+        """
+        return self._shape[-2:]
+
+    @property
+    def height(self):
+        return self._shape[-2]
+
+    @property
+    def width(self):
+        return self._shape[-1]
+
+    @property
+    def frame_rate(self):
+        return self._frame_rate
+
+    @property
+    def asynchronous(self):
+        return self._asynchronous
+
+    def buffer(self):
+        """
+        Frame slot to fill in place and pass to `imshow`, which then sends it
+        without copying.
+
+        Returns
+        -------
+        frame : :py:class:`~numpy.ndarray`
+            Writable uint8 array in shared memory, of the shape of the device's
+            masks. Valid until the next call of `buffer` or `imshow`.
+        """
+        slot = self._next
+        while slot in self._pending:
+            self._receive()
+        return self._slots[slot]
+
+    def imshow(self, I):
+        """
+        Display a mask on the served SLM.
+
+        Parameters
+        ----------
+        I : :py:class:`~numpy.ndarray`
+            uint8 mask accepted by the device's `imshow`, i.e. of its
+            `mask_shape` or (N_height, N_width) for grayscale, or an array
+            returned by `buffer`.
+
+        Returns
+        -------
+        presented : float or None
+            `time.perf_counter` timestamp at which the server presented the
+            mask, None in asynchronous mode, where errors are raised by a later
+            call.
+        """
+        slot = self._next
+        frame = self.buffer()
+        if not (I.ctypes.data == frame.ctypes.data and I.shape == frame.shape):
+            # grayscale masks of color devices are sent as equal channels
+            if I.shape not in (frame.shape, frame.shape[-2:]):
+                raise ValueError(
+                    f"Parameter[I]: shape {I.shape} does not match the device's {frame.shape}."
+                )
+            np.copyto(frame, I, casting="safe")
+
+        self._conn.send(("imshow", slot))
+        self._pending.append(slot)
+        self._next = (slot + 1) % len(self._slots)
+
+        if not self._asynchronous:
+            return self.wait_presented()
+
+    def clear(self):
+        """
+        Clear the served SLM, once the pending masks are shown.
+        """
+        self.wait_presented()
+        self._conn.send(("clear",))
+        self._pending.append(None)
+        self.wait_presented()
+
+    def wait_presented(self):
+        """
+        Wait until the server has presented every mask sent so far.
+
+        Returns
+        -------
+        presented : float or None
+            `time.perf_counter` timestamp at which the last mask was presented,
+            None if nothing was pending.
+        """
+        presented = None
+        while self._pending:
+            presented = self._receive()
+        return presented
+
+    def _receive(self):
+        self._pending.popleft()
+        status, value = self._conn.recv()
+        if status == "error":
+            raise value
+        return value
+
+    def close(self):
+        """
+        Disconnect from the server. The SLM stays open.
+        """
+        if self._conn is None:
+            return
+        try:
+            self.wait_presented()
+        finally:
+            self._conn.send(("close",))
+            self._conn.close()
+            self._conn = None
+            self._slots = None
+            self._shm.close()
+
+
+def connect(address=None, authkey=None, asynchronous=False):
+    """
+    Connect to a frame server.
+
+    Parameters
+    ----------
+    address : tuple or str, optional
+        Address of the server, by default `default_address()`.
+    authkey : bytes, optional
+        Key of the server.
+    asynchronous : bool
+        Return from `imshow` as soon as the frame is handed over, rather than
+        once it is presented, so that the next frame can be prepared meanwhile.
+
+    Returns
+    -------
+    proxy : :py:class:`SLMProxy`
+        Proxy with `imshow`, `clear` and `buffer`.
+    """
+    return SLMProxy(address, authkey=authkey, asynchronous=asynchronous)
+
+
+def main(argv=None):
+    from slm_controller import slm
+
+    parser = argparse.ArgumentParser(prog="slm-server", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("device", help="Device key, see `slm.available_devices`.")
+    parser.add_argument(
+        "--socket", default=None, help="Unix socket to listen on, by default `default_address()`."
+    )
+    parser.add_argument(
+        "--host", default=None, help="Host to listen on over TCP, requires SLM_SERVER_AUTHKEY."
+    )
+    parser.add_argument(
+        "--port", type=int, default=None, help="Port to listen on over TCP, see --host."
+    )
+    parser.add_argument("--slots", type=int, default=2, help="Frame slots per client.")
+    parser.add_argument("--simulate", action="store_true", help="Use the simulated device.")
+    args = parser.parse_args(argv)
+
+    authkey = os.environ.get("SLM_SERVER_AUTHKEY")
+    authkey = authkey.encode() if authkey else None
+
+    if args.host is not None or args.port is not None:
+        address = (args.host or DEFAULT_TCP_ADDRESS[0], args.port or DEFAULT_TCP_ADDRESS[1])
+    else:
+        address = args.socket
+    if isinstance(address or default_address(), tuple) and not authkey:
+        parser.error("listening on TCP requires a key, set SLM_SERVER_AUTHKEY.")
+
+    kwargs = {"simulate": True} if args.simulate else {}
+    device = slm.create(args.device, **kwargs)
+    server = FrameServer(device, args.device, address=address, authkey=authkey, n_slots=args.slots)
+    print(f"Serving {args.device} on {server.address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
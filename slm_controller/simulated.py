@@ -0,0 +1,410 @@
+"""
+Simulated display backends, standing in for the hardware drivers.
+
+They accept the same calls as the objects wrapped by the SLM classes, record
+the exact bytes or frames they receive and model how long the transfers take:
+SPI transfers from the configured baud rate, and presentation on panels that
+declare a `FRAME_RATE` at the next refresh. With `realtime=True` the calls
+block for the modelled duration, so that timings measured around them are
+realistic; otherwise they return immediately and only the modelled clock
+`elapsed` advances.
+"""
+
+import math
+import time
+import types
+from collections import namedtuple
+
+import numpy as np
+
+from slm_controller.hardware import SLMDevices, SLMParam, slm_devices
+from slm_controller.playback import sleep_until
+
+Transfer = namedtuple("Transfer", ["command", "data", "duration"])
+Transfer.__doc__ = """
+Record of a simulated transfer: command byte (None for pure data), data bytes
+(or frame for the Holoeye) and modelled duration [s].
+"""
+
+
+class _SimulatedDevice:
+    def __init__(self, frame_rate=None, realtime=True, record=True):
+        self.frame_rate = frame_rate
+        self.realtime = realtime
+        self.record = record
+        self.transfers = []
+        self.elapsed = 0.0
+        self._start = time.perf_counter()
+
+    def reset_log(self):
+        """
+        Forget recorded transfers and reset the modelled clock.
+        """
+        self.transfers = []
+        self.elapsed = 0.0
+        self._start = time.perf_counter()
+
+    def _sync(self):
+        """
+        In real time, catch the modelled clock up with the time spent idle.
+        """
+        if self.realtime:
+            self.elapsed = max(self.elapsed, time.perf_counter() - self._start)
+
+    def _advance(self, duration):
+        """
+        Advance the modelled clock, and the real one if in real time.
+        """
+        self._sync()
+        self.elapsed += duration
+        if self.realtime:
+            sleep_until(self._start + self.elapsed)
+        return duration
+
+    def _next_refresh(self):
+        """
+        Advance the modelled clock to the next panel refresh, if the panel has a
+        frame rate.
+        """
+        if not self.frame_rate:
+            return 0.0
+        self._sync()
+        period = 1 / self.frame_rate
+        wait = math.ceil(self.elapsed / period) * period - self.elapsed
+        return self._advance(wait)
+
+
+class _SimulatedSPIDevice(_SimulatedDevice):
+    def __init__(self, baudrate, transaction_overhead, **kwargs):
+        super().__init__(**kwargs)
+        self.baudrate = baudrate
+        self.transaction_overhead = transaction_overhead
+
+    def transfer_time(self, nbytes):
+        """
+        Modelled duration [s] of an SPI transaction of `nbytes` bytes.
+        """
+        return self.transaction_overhead + 8 * nbytes / self.baudrate
+
+    def _transfer(self, command=None, data=b""):
+        data = bytes(data)
+        nbytes = len(data) + (command is not None)
+        duration = self._advance(self.transfer_time(nbytes))
+        if self.record:
+            self.transfers.append(Transfer(command, data, duration))
+
+    @property
+    def bytes_sent(self):
+        """
+        Total number of recorded bytes, commands included.
+        """
+        return sum(len(t.data) + (t.command is not None) for t in self.transfers)
+
+
+class SimulatedST7735R(_SimulatedSPIDevice):
+    # commands used to write a window of the display RAM
+    _COLUMN_SET = 0x2A
+    _PAGE_SET = 0x2B
+    _RAM_WRITE = 0x2C
+
+    def __init__(
+        self,
+        rotation=90,
+        baudrate=24000000,
+        width=128,
+        height=160,
+        transaction_overhead=50e-6,
+        frame_rate=None,
+        realtime=True,
+        record=True,
+    ):
+        """
+        Simulated ST7735R TFT controller, as driven by `AdafruitSLM`.
+
+        Parameters
+        ----------
+        rotation : 0, 90, 180, or 270
+            Rotation of images on the display.
+        baudrate : int
+            SPI baud rate.
+        width, height : int
+            Native panel resolution.
+        transaction_overhead : float
+            Fixed cost [s] of each SPI transaction.
+        frame_rate : float, optional
+            Panel refresh rate [Hz], by default the `FRAME_RATE` declared for
+            the Adafruit SLM, if any.
+        realtime : bool
+            Whether calls block for their modelled duration.
+        record : bool
+            Whether to record transfers.
+        """
+        if frame_rate is None:
+            frame_rate = slm_devices[SLMDevices.ADAFRUIT.value].get(SLMParam.FRAME_RATE)
+        super().__init__(
+            baudrate,
+            transaction_overhead,
+            frame_rate=frame_rate,
+            realtime=realtime,
+            record=record,
+        )
+        self.rotation = rotation
+        self.width = width
+        self.height = height
+
+        # display RAM, RGB565
+        self.ram = np.zeros((height, width), dtype=">u2")
+
+    def _block(self, x0, y0, x1, y1, data=None):
+        assert data is not None, "Reading from the simulated display is not supported."
+        pixels = np.frombuffer(bytes(data), dtype=">u2").reshape(y1 - y0 + 1, x1 - x0 + 1)
+
+        self._transfer(self._COLUMN_SET, np.array([x0, x1], dtype=">u2").tobytes())
+        self._transfer(self._PAGE_SET, np.array([y0, y1], dtype=">u2").tobytes())
+        self._transfer(self._RAM_WRITE)
+        self._transfer(data=data)
+        self.ram[y0 : y1 + 1, x0 : x1 + 1] = pixels
+        self._next_refresh()
+
+    def fill(self, color=0):
+        data = np.full(self.ram.size, color, dtype=">u2").tobytes()
+        self._block(0, 0, self.width - 1, self.height - 1, data)
+
+
+class _Pin:
+    """
+    Output pin, as `digitalio.DigitalInOut`.
+    """
+
+    def __init__(self, value=False):
+        self.value = value
+
+
+class _SPIDevice:
+    """
+    SPI device with chip select, as `adafruit_bus_device.spi_device.SPIDevice`:
+    the bus is used within a `with` block, and every `write` is one
+    transaction.
+    """
+
+    def __init__(self, write):
+        self._write = write
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def write(self, buf, start=0, end=None):
+        self._write(memoryview(buf)[start:end])
+
+
+class SimulatedPCD8544(_SimulatedSPIDevice):
+    _SETYADDR = 0x40
+    _SETXADDR = 0x80
+
+    def __init__(
+        self,
+        baudrate=1000000,
+        width=84,
+        height=48,
+        transaction_overhead=50e-6,
+        frame_rate=None,
+        realtime=True,
+        record=True,
+    ):
+        """
+        Simulated PCD8544 LCD controller, with the interface of the
+        `adafruit_pcd8544.PCD8544` driver used by `NokiaSLM`: `write_cmd`,
+        `fill`, `show` and `buffer`, and its data/command pin `_dc_pin` and
+        `spi_device` for raw writes. Bytes written while the data/command pin
+        is low are interpreted as commands, otherwise as display data.
+
+        Parameters
+        ----------
+        baudrate : int
+            SPI baud rate.
+        width, height : int
+            Native panel resolution.
+        transaction_overhead : float
+            Fixed cost [s] of each SPI transaction.
+        frame_rate : float, optional
+            Panel refresh rate [Hz], by default the `FRAME_RATE` declared for
+            the Nokia SLM, if any.
+        realtime : bool
+            Whether calls block for their modelled duration.
+        record : bool
+            Whether to record transfers.
+        """
+        if frame_rate is None:
+            frame_rate = slm_devices[SLMDevices.NOKIA_5110.value].get(SLMParam.FRAME_RATE)
+        super().__init__(
+            baudrate,
+            transaction_overhead,
+            frame_rate=frame_rate,
+            realtime=realtime,
+            record=record,
+        )
+        self.width = width
+        self.height = height
+
+        # frame buffer as held by the adafruit_pcd8544 driver, and display RAM
+        self.buffer = bytearray(width * height // 8)
+        self.ram = np.zeros((height // 8, width), dtype=np.uint8)
+        self._bank = 0
+        self._column = 0
+
+        # as the attributes of the driver
+        self._dc_pin = _Pin()
+        self.spi_device = _SPIDevice(self._spi_write)
+
+    def write_cmd(self, cmd):
+        self._dc_pin.value = 0
+        with self.spi_device as spi:
+            spi.write(bytearray([cmd]))
+
+    def _spi_write(self, data):
+        if not self._dc_pin.value:
+            for cmd in bytes(data):
+                self._command(cmd)
+        else:
+            self._data(data)
+
+    def _command(self, cmd):
+        self._transfer(cmd)
+        if cmd & self._SETXADDR:
+            self._column = cmd & 0x7F
+        elif cmd & self._SETYADDR:
+            self._bank = cmd & 0x07
+
+    def _data(self, data):
+        self._transfer(data=data)
+
+        # horizontal addressing: the column increments, then wraps to the next bank
+        start = self._bank * self.width + self._column
+        data = np.frombuffer(bytes(data), dtype=np.uint8)
+        self.ram.reshape(-1)[start : start + len(data)] = data
+        end = (start + len(data)) % self.ram.size
+        self._bank, self._column = divmod(end, self.width)
+        self._next_refresh()
+
+    def fill(self, color):
+        self.buffer[:] = bytes([0xFF if color else 0x00]) * len(self.buffer)
+
+    def show(self):
+        self.write_cmd(self._SETYADDR)
+        self.write_cmd(self._SETXADDR)
+        self._dc_pin.value = 1
+        with self.spi_device as spi:
+            spi.write(self.buffer)
+
+
+class _DataHandle:
+    def __init__(self, data):
+        self.data = data
+        self.durationInFrames = 1
+
+
+class _SimulatedSLMInstance(_SimulatedDevice):
+    def __init__(self, frame_rate, realtime, record):
+        super().__init__(frame_rate=frame_rate, realtime=realtime, record=record)
+        self.opened = False
+        self.shown = None
+        self._hold_until = 0.0
+
+    def requiresVersion(self, version):
+        return version <= 3
+
+    def open(self):
+        self.opened = True
+        return _ErrorCode.NoError
+
+    def close(self):
+        self.opened = False
+        return _ErrorCode.NoError
+
+    def errorString(self, error):
+        return f"Simulated SDK error {error}".encode("utf-8")
+
+    def _present(self, command, frame, n_frames=1):
+        # wait for the previous frame's duration, then for the next refresh
+        self._sync()
+        if self.elapsed < self._hold_until:
+            self._advance(self._hold_until - self.elapsed)
+        duration = self._next_refresh()
+        self.shown = frame
+        self._hold_until = self.elapsed + n_frames / self.frame_rate
+        if self.record:
+            self.transfers.append(Transfer(command, frame, duration))
+        return _ErrorCode.NoError
+
+    def showBlankscreen(self, value):
+        return self._present("showBlankscreen", np.full((1, 1), value, dtype=np.uint8))
+
+    def showData(self, data, flags=0):
+        return self._present("showData", np.array(data) if self.record else data)
+
+    def loadData(self, data):
+        return _ErrorCode.NoError, _DataHandle(np.array(data))
+
+    def updateDatahandle(self, handle, value):
+        return _ErrorCode.NoError
+
+    def showDatahandle(self, handle, flags=0):
+        return self._present("showDatahandle", handle.data, handle.durationInFrames)
+
+    def releaseDatahandle(self, handle):
+        handle.data = None
+        return _ErrorCode.NoError
+
+    def utilsWaitUntilClosed(self):
+        return _ErrorCode.NoError
+
+    def utilsWaitForCheckedS(self, seconds):
+        self._advance(seconds)
+        return _ErrorCode.NoError
+
+
+class _ErrorCode:
+    NoError = 0
+
+
+def holoeye_sdk(frame_rate=None, realtime=True, record=True):
+    """
+    Simulated stand-in for the `holoeye.slmdisplaysdk` module, to pass to
+    `HoloeyeSLM(sdk=...)`.
+
+    Frames are presented at the next refresh of the panel, and data handles are
+    held for their duration before the next one is shown, as by the SDK. The
+    `SLMInstance` created by the driver is available as the `instance`
+    attribute of the returned module, to inspect the recorded frames.
+
+    Parameters
+    ----------
+    frame_rate : float, optional
+        Refresh rate [Hz], by default the `FRAME_RATE` of the LC 2012.
+    realtime : bool
+        Whether calls block for their modelled duration.
+    record : bool
+        Whether to record a copy of every frame shown.
+
+    Returns
+    -------
+    sdk : module
+        Object with the attributes of the SDK module used by `HoloeyeSLM`.
+    """
+    if frame_rate is None:
+        frame_rate = slm_devices[SLMDevices.HOLOEYE_LC_2012.value][SLMParam.FRAME_RATE]
+
+    sdk = types.SimpleNamespace(instance=None)
+
+    def SLMInstance():
+        sdk.instance = _SimulatedSLMInstance(frame_rate, realtime, record)
+        return sdk.instance
+
+    sdk.SLMInstance = SLMInstance
+    sdk.ErrorCode = _ErrorCode
+    sdk.ShowFlags = types.SimpleNamespace(PresentAutomatic=1, PresentFitWithBars=2)
+    sdk.ApplyDataHandleValue = types.SimpleNamespace(DurationInFrames=1)
+    return sdk
@@ -1,17 +1,160 @@
 import abc
+import atexit
+import contextlib
+import functools
+import logging
+import threading
+import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 
-import matplotlib.pyplot as plt
 import numpy as np
-from PIL import Image, ImageDraw
 
+from slm_controller import playback
+from slm_controller.encoding import PCD8544Encoder, RGB565Encoder, as_bytes, bit_planes
+from slm_controller.frames import FrameCache, PreparedFrame
 from slm_controller.hardware import SLMDevices, SLMParam, slm_devices
+from slm_controller.metrics import Metrics
+from slm_controller.preview import PreviewSink, WindowPreview
+from slm_controller.worker import PresentationWorker
+
+logger = logging.getLogger(__name__)
+
+# PCD8544 commands to set the RAM address, OR-ed with the bank / column index
+_PCD8544_SETYADDR = 0x40
+_PCD8544_SETXADDR = 0x80
+
+
+def _dirty_rectangles(previous, current, max_rectangles=8):
+    """
+    Bounding rectangles of the pixels that differ between two frames.
+
+    Changed rows are grouped into bands of consecutive rows, and each band is
+    bounded by its first and last changed column.
+
+    Parameters
+    ----------
+    previous : :py:class:`~numpy.ndarray`
+        ([N_channel,] N_height, N_width) frame currently displayed.
+    current : :py:class:`~numpy.ndarray`
+        Frame to display, same shape as `previous`.
+    max_rectangles : int
+        If more bands are found, a single bounding rectangle is returned instead
+        as every window costs a few extra commands on the bus.
+
+    Returns
+    -------
+    rectangles : list(tuple(int))
+        (row_start, col_start, row_stop, col_stop) of each changed region.
+    """
+    changed = previous != current
+    if changed.ndim == 3:
+        changed = changed.any(axis=0)
+
+    rows = np.flatnonzero(changed.any(axis=1))
+    if rows.size == 0:
+        return []
+
+    breaks = np.flatnonzero(np.diff(rows) > 1)
+    starts = np.concatenate(([rows[0]], rows[breaks + 1]))
+    stops = np.concatenate((rows[breaks], [rows[-1]])) + 1
+    if len(starts) > max_rectangles:
+        starts, stops = starts[:1], stops[-1:]
+
+    rectangles = []
+    for row_start, row_stop in zip(starts, stops):
+        cols = np.flatnonzero(changed[row_start:row_stop].any(axis=0))
+        rectangles.append((int(row_start), int(cols[0]), int(row_stop), int(cols[-1]) + 1))
+    return rectangles
+
+
+# previews of the SLM calls of a thread, collected rather than shown, see
+# `_defer_previews`
+_deferred_previews = threading.local()
+
+
+@contextlib.contextmanager
+def _defer_previews():
+    """
+    Collect the previews of the SLM calls made by this thread instead of
+    showing them, so that another thread, which owns the GUI, shows them with
+    `_show_deferred_previews`.
+
+    Yields
+    ------
+    previews : list(tuple)
+        (slm, mask) of each preview, in call order.
+    """
+    previews = []
+    _deferred_previews.previews = previews
+    try:
+        yield previews
+    finally:
+        _deferred_previews.previews = None
+
+
+def _show_deferred_previews(previews):
+    for device, I in previews:
+        with device._metrics.time("preview"):
+            device._show_preview(I)
+            device._hold_preview()
+
+
+async def _await_presented(future):
+    """
+    Wait for a call of the presentation worker from the event loop of the
+    caller.
+
+    A call superseded by a later submission is cancelled by the worker, which
+    is not a cancellation of the awaiting task, so this returns normally. If
+    the awaiting task is cancelled, the call is skipped unless it has started.
+
+    Returns
+    -------
+    presented : float or None
+        `time.perf_counter` timestamp at which the call returned, None if it
+        was superseded.
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    waiter = loop.create_future()
+
+    def wake(_):
+        loop.call_soon_threadsafe(lambda: waiter.done() or waiter.set_result(None))
+
+    future.add_done_callback(wake)
+    try:
+        await waiter
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    if future.cancelled():
+        return None
+    return future.result()
 
 
 class SLM:
     def __init__(self):
         self._slm = None
         self._preview = False
+        self._preview_sink = None
+        self._frame_rate = None
+        self._settle_time = None
+        self._worker = None
+        self._cache = None
+        self._metrics = Metrics()
+        self._io_executor = None
+        self._closed = True
+        # `time.perf_counter` timestamp at which the last mask was sent, set by
+        # devices that keep showing it before returning, e.g. for a show time
+        self._transferred = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     @property
     def height(self):
@@ -21,6 +164,21 @@ class SLM:
     def preview(self):
         return self._preview
 
+    @property
+    def preview_sink(self):
+        """
+        Returns
+        -------
+        sink : :py:class:`~slm_controller.preview.PreviewSink` or None
+            Destination of the previews, None until the first preview if none
+            was set.
+        """
+        return self._preview_sink
+
+    @property
+    def asynchronous(self):
+        return self._worker is not None
+
     @property
     def width(self):
         return self._width
@@ -35,6 +193,151 @@ class SLM:
         """
         return self._height, self._width
 
+    @property
+    def mask_shape(self):
+        """
+        Returns
+        -------
+        sh : tuple(int)
+            Shape of the full masks `imshow` takes: (N_height, N_width), or
+            ([3,] N_height, N_width) for color devices.
+        """
+        return self.shape
+
+    @property
+    def virtual(self):
+        """
+        Returns
+        -------
+        virtual : bool
+            Whether no display, real or simulated, is driven, masks being only
+            previewed. Drivers that do not keep their device handle in `_slm`
+            override this.
+        """
+        return not self._slm
+
+    @property
+    def frame_rate(self):
+        """
+        Returns
+        -------
+        rate : float or None
+            Nominal frame rate [Hz] declared in `slm_devices`, None if unknown.
+        """
+        return self._frame_rate
+
+    @property
+    def settle_time(self):
+        """
+        Returns
+        -------
+        settle_time : float
+            Time [s] for the display to settle after a mask is sent, e.g. before
+            a measurement. By default one frame period, or 0 if the frame rate
+            is unknown.
+        """
+        if self._settle_time is not None:
+            return self._settle_time
+        return 1 / self._frame_rate if self._frame_rate else 0.0
+
+    def set_settle_time(self, settle_time):
+        """
+        Set the time for the display to settle after a mask is sent, e.g. the
+        measured response time of the liquid crystal.
+
+        Parameters
+        ----------
+        settle_time : float or None
+            Settle time [s], None to restore the default.
+        """
+        self._settle_time = settle_time
+
+    @property
+    def metrics(self):
+        """
+        Returns
+        -------
+        metrics : :py:class:`~slm_controller.metrics.Metrics`
+            Per-stage latency histograms and counters of this SLM.
+        """
+        return self._metrics
+
+    def set_metrics(self, metrics):
+        """
+        Set where this SLM records its stage timings and counters, e.g. to
+        share one :py:class:`~slm_controller.metrics.Metrics` between devices
+        or to pass timings to a callback.
+
+        Parameters
+        ----------
+        metrics : :py:class:`~slm_controller.metrics.Metrics`
+            Object providing `time(stage)`, `record(stage, seconds)` and
+            `increment(name, n)`.
+        """
+        self._metrics = metrics
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def open(self):
+        """
+        Initialize the device, if closed. Devices are opened on construction,
+        so this is only needed to reuse a device after `close`.
+
+        The duration is recorded under the `open` stage of `metrics`.
+
+        Returns
+        -------
+        slm : :py:class:`SLM`
+            This SLM, e.g. for `with slm.open():`.
+        """
+        if self._closed:
+            with self._metrics.time("open"):
+                self._open()
+            self._closed = False
+        return self
+
+    def close(self):
+        """
+        Wait for pending masks, stop the threads of the SLM and release the
+        device, e.g. its pins or SDK window. Further display calls raise until
+        `open` is called again, which restores synchronous mode.
+
+        The duration is recorded under the `close` stage of `metrics`.
+        """
+        if self._closed:
+            return
+        try:
+            self.wait_presented()
+        finally:
+            self.set_asynchronous(False)
+            if self._io_executor is not None:
+                self._io_executor.shutdown(wait=True)
+                self._io_executor = None
+            try:
+                with self._metrics.time("close"):
+                    self._close()
+            finally:
+                self._slm = None
+                self._closed = True
+
+    def _open(self):
+        """
+        Initialize the device handle `_slm`, None for a virtual device.
+        """
+        pass
+
+    def _close(self):
+        """
+        Release the device handle.
+        """
+        pass
+
+    def _check_open(self):
+        if self._closed:
+            raise RuntimeError(f"{type(self).__name__} is closed, call `open` first.")
+
     @abc.abstractmethod
     def clear(self):
         """
@@ -42,7 +345,6 @@ class SLM:
         """
         pass
 
-    @abc.abstractmethod
     def imshow(self, I):
         """
         Display data as an image, i.e., on a 2D regular raster.
@@ -52,21 +354,433 @@ class SLM:
         I : :py:class:`~numpy.ndarray`
             ([3,] N_height, N_width) non-negative reals.
             Interpretation of the optional 0-th dimension is class-dependent.
+
+        Returns
+        -------
+        future : :py:class:`~concurrent.futures.Future` or None
+            Future resolving once the mask is on the display in asynchronous
+            mode, None otherwise.
+        """
+        with self._metrics.time("imshow"):
+            data = self._stage(I)
+            if self._slm:
+                return self._present(data)
+
+    def prepare(self, I):
+        """
+        Validate and encode a mask once, to display it repeatedly with
+        `show_prepared`.
+
+        Parameters
+        ----------
+        I : :py:class:`~numpy.ndarray`
+            Mask accepted by `imshow`.
+
+        Returns
+        -------
+        frame : :py:class:`~slm_controller.frames.PreparedFrame`
+            Device-ready frame. It holds a copy of `I`, so `I` may be modified
+            afterwards.
+        """
+        self._check_mask(I)
+        return self._prepare(I)
+
+    def show_prepared(self, frame):
+        """
+        Display a frame returned by `prepare`, skipping validation and encoding.
+
+        Parameters
+        ----------
+        frame : :py:class:`~slm_controller.frames.PreparedFrame`
+            Frame prepared by this SLM.
+
+        Returns
+        -------
+        future : :py:class:`~concurrent.futures.Future` or None
+            Future resolving once the mask is on the display in asynchronous
+            mode, None otherwise.
+        """
+        assert frame.device is self, "Frame was prepared for another SLM."
+        self._check_open()
+
+        self._handle_preview(frame.mask)
+
+        if self._slm:
+            return self._present(frame.data)
+
+    def set_cache_size(self, maxsize):
+        """
+        Set how many encoded masks `imshow` keeps for reuse.
+
+        Masks are identified by a hash of their content, so showing the same
+        mask again skips its encoding. The least recently shown masks are
+        evicted first.
+
+        Parameters
+        ----------
+        maxsize : int or None
+            Maximum number of cached masks, None or 0 to disable caching.
+        """
+        self._cache = FrameCache(maxsize) if maxsize else None
+
+    def cache_info(self):
+        """
+        Returns
+        -------
+        info : :py:class:`~slm_controller.frames.CacheInfo` or None
+            Hits, misses, evictions, size and memory of the cache of encoded
+            masks, None if caching is disabled.
+        """
+        if self._cache is None:
+            return None
+        return self._cache.info()
+
+    def _check_mask(self, I):
+        """
+        Check that a mask can be displayed.
+
+        Parameters
+        ----------
+        I : :py:class:`~numpy.ndarray`
+            Mask to check.
+        """
+        assert isinstance(I, np.ndarray) and np.issubdtype(I.dtype, np.uint8)
+        assert I.shape == self.shape
+
+    @abc.abstractmethod
+    def _encode(self, I):
+        """
+        Convert a valid mask to the data sent to the device.
+
+        Parameters
+        ----------
+        I : :py:class:`~numpy.ndarray`
+            Mask to encode.
+
+        Returns
+        -------
+        data : :py:class:`~numpy.ndarray`
+            Encoded mask. May be a view of a buffer reused by the next call.
+        """
+        pass
+
+    @abc.abstractmethod
+    def _show_encoded(self, data):
+        """
+        Send an encoded mask to the device.
+
+        Parameters
+        ----------
+        data : :py:class:`~numpy.ndarray`
+            Mask encoded by `_encode`.
         """
         pass
 
+    def _stage(self, I):
+        """
+        Validate, preview and encode a mask, i.e. everything `imshow` does
+        before talking to the device.
+
+        Returns
+        -------
+        data : :py:class:`~numpy.ndarray` or None
+            Encoded mask, None for a virtual device.
+        """
+        self._check_open()
+        with self._metrics.time("validate"):
+            self._check_mask(I)
+
+        self._handle_preview(I)
+
+        if self._slm:
+            with self._metrics.time("encode"):
+                return self._encode_mask(I)
+
+    def _present(self, data):
+        """
+        Send a mask encoded by `_stage` to the device.
+
+        Returns
+        -------
+        future : :py:class:`~concurrent.futures.Future` or None
+            Future of the call in asynchronous mode, None otherwise.
+        """
+        self._metrics.increment("frames")
+        return self._submit(self._show_encoded, data)
+
+    def _encode_mask(self, I):
+        """
+        Encode a mask, going through the cache if enabled.
+        """
+        if self._cache is not None:
+            return self._cache.get(I, self._prepare).data
+
+        try:
+            return self._encode(I)
+        except Exception as e:
+            raise ValueError("Parameter[I]: unsupported data") from e
+
+    def _prepare(self, I):
+        """
+        Build a prepared frame from a valid mask.
+        """
+        mask = np.array(I)
+        mask.setflags(write=False)
+
+        try:
+            data = self._encode(mask)
+        except Exception as e:
+            raise ValueError("Parameter[I]: unsupported data") from e
+        if data is not mask:
+            data = np.array(data)
+            data.setflags(write=False)
+
+        return PreparedFrame(self, mask, data)
+
+    def play(self, frames, fps=None, drop_late=True, late_tolerance=None):
+        """
+        Display a sequence of masks at a target frame rate.
+
+        Presentation is paced against a monotonic clock, see
+        :py:func:`slm_controller.playback.play`. Devices whose `imshow` blocks,
+        e.g. `HoloeyeSLM` waiting for its show time, bound the achievable rate.
+
+        Parameters
+        ----------
+        frames : iterable
+            Masks accepted by `imshow`, or frames returned by `prepare`.
+            Generators are consumed lazily.
+        fps : float, optional
+            Target frame rate [Hz], by default the device's `frame_rate`. If
+            neither is available, masks are shown as fast as possible.
+        drop_late : bool
+            Skip masks whose time slot has already passed.
+        late_tolerance : float, optional
+            Delay [s] after its deadline from which a mask is counted as late, by
+            default 10% of the frame period.
+
+        Returns
+        -------
+        stats : :py:class:`~slm_controller.playback.PlaybackStats`
+            Presented, dropped and late frames of the run.
+        """
+        if fps is None:
+            fps = self._frame_rate
+
+        def show(frame):
+            if isinstance(frame, PreparedFrame):
+                self.show_prepared(frame)
+            else:
+                self.imshow(frame)
+
+        stats = playback.play(
+            show, frames, fps=fps, drop_late=drop_late, late_tolerance=late_tolerance
+        )
+        if self._preview_sink is not None:
+            # end on the last mask, which the rate limit of the preview may have skipped
+            self._preview_sink.flush()
+        return stats
+
+    async def aimshow(self, I, **kwargs):
+        """
+        Asynchronous counterpart of `imshow`, for asyncio applications.
+
+        The blocking device I/O runs on a thread dedicated to the SLM, so that
+        concurrent `aimshow` / `aclear` calls on the same SLM are performed one
+        after the other, in call order, without blocking the event loop. The
+        preview, if any, is shown from the calling thread once the mask is
+        sent. `I` must not be modified before the call returns.
+
+        Cancelling the call before the mask reaches the device skips it. Once
+        the transfer has started, it completes in the background. In
+        asynchronous mode, a mask superseded by a later one before reaching the
+        device is skipped too, and the call returns normally.
+
+        Parameters
+        ----------
+        I : :py:class:`~numpy.ndarray`
+            Mask accepted by `imshow`.
+        **kwargs
+            Passed to `imshow`, e.g. `roi` for `AdafruitSLM`.
+        """
+        future = await self._run_io(functools.partial(self.imshow, I, **kwargs))
+        if future is not None:
+            # asynchronous mode, wait for the presentation worker
+            await _await_presented(future)
+
+    async def ashow_prepared(self, frame):
+        """
+        Asynchronous counterpart of `show_prepared`, see `aimshow`.
+        """
+        future = await self._run_io(functools.partial(self.show_prepared, frame))
+        if future is not None:
+            await _await_presented(future)
+
+    async def aclear(self):
+        """
+        Asynchronous counterpart of `clear`, see `aimshow`.
+        """
+        future = await self._run_io(self.clear)
+        if future is not None:
+            await _await_presented(future)
+
+    def aplay(self, frames, fps=None, drop_late=True):
+        """
+        Display a sequence of masks at a target frame rate, without blocking the
+        event loop, see :py:func:`slm_controller.playback.aplay`::
+
+            async for index, lateness in slm.aplay(masks, fps=30):
+                ...
+
+        Parameters
+        ----------
+        frames : iterable or asynchronous iterable
+            Masks accepted by `imshow`, or frames returned by `prepare`.
+        fps : float, optional
+            Target frame rate [Hz], by default the device's `frame_rate`.
+        drop_late : bool
+            Skip masks whose time slot has already passed.
+
+        Returns
+        -------
+        iterator : asynchronous iterator
+            Yields the index and lateness [s] of each presented mask.
+        """
+        if fps is None:
+            fps = self._frame_rate
+
+        async def show(frame):
+            if isinstance(frame, PreparedFrame):
+                await self.ashow_prepared(frame)
+            else:
+                await self.aimshow(frame)
+
+        return playback.aplay(show, frames, fps=fps, drop_late=drop_late)
+
+    async def _run_io(self, fn):
+        """
+        Run a blocking call on the I/O thread of the SLM. Its previews are shown
+        from the calling thread, as GUI toolkits expect.
+        """
+        if self._io_executor is None:
+            self._io_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=f"{type(self).__name__}-io"
+            )
+        # imported here, as it noticeably slows down the import of this module
+        import asyncio
+
+        def call():
+            with _defer_previews() as previews:
+                return fn(), previews
+
+        result, previews = await asyncio.get_running_loop().run_in_executor(self._io_executor, call)
+        for device, I in previews:
+            with device._metrics.time("preview"):
+                device._show_preview(I)
+            # e.g. the show time of a virtual Holoeye, waited without blocking the loop
+            await device._ahold_preview()
+        return result
+
+    def set_asynchronous(self, asynchronous):
+        """
+        Set whether device calls are performed by a background worker.
+
+        In asynchronous mode, `imshow` and `clear` hand their work over to a
+        worker thread that owns the device handle and return immediately. Only
+        the latest pending mask is kept, so masks submitted faster than the
+        device can present them are skipped. Use `wait_presented` or the future
+        returned by `imshow` to synchronise with the display.
+
+        Parameters
+        ----------
+        asynchronous : bool
+            Whether to use a background worker.
+        """
+        if asynchronous and self._worker is None:
+            self._worker = PresentationWorker(name=f"{type(self).__name__}-presentation")
+        elif not asynchronous and self._worker is not None:
+            self._worker.close()
+            self._worker = None
+
+    def wait_presented(self, timeout=None):
+        """
+        Block until the most recently submitted mask or clear has reached the
+        device. Returns immediately in synchronous mode.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Maximum time to wait [s], by default no limit.
+
+        Returns
+        -------
+        timestamp : float or None
+            `time.perf_counter` timestamp at which the device call completed,
+            None if nothing was submitted asynchronously.
+        """
+        if self._worker is None:
+            return None
+        return self._worker.wait(timeout)
+
+    def _submit(self, fn, I=None):
+        """
+        Perform a device call, on the background worker in asynchronous mode.
+
+        Parameters
+        ----------
+        fn : callable
+            Device call, taking the mask as only argument if `I` is given.
+        I : :py:class:`~numpy.ndarray`, optional
+            Mask to hand over to `fn`.
+
+        Returns
+        -------
+        future : :py:class:`~concurrent.futures.Future` or None
+            Future of the call in asynchronous mode, None otherwise.
+        """
+        self._check_open()
+        if self._worker is not None:
+            return self._worker.submit(fn, I)
+
+        if I is None:
+            fn()
+        else:
+            fn(I)
+        return None
+
     def set_preview(self, preview):
         """
         Set whether to show the preview of the mask.
 
+        Previews go to a single window per SLM, updated in place, unless
+        another sink is given. Virtual devices always preview.
+
         Parameters
         ----------
-        preview : boolean
-            Whether to show the preview of the mask.
+        preview : boolean or :py:class:`~slm_controller.preview.PreviewSink`
+            Whether to show the preview of the mask, or where to send it, e.g.
+            a :py:class:`~slm_controller.preview.PNGSequencePreview` on
+            machines without display.
         """
+        if isinstance(preview, PreviewSink):
+            if self._preview_sink is not None and self._preview_sink is not preview:
+                self._preview_sink.close()
+            self._preview_sink = preview
+            preview = True
         self._preview = preview
 
-    @abc.abstractmethod
+    def wait_preview(self, timeout=None):
+        """
+        Keep the preview visible, e.g. at the end of a script.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Time to wait [s], by default until the preview window is closed.
+        """
+        if self._preview_sink is not None:
+            self._preview_sink.wait(timeout)
+
     def _show_preview(self, I):
         """
         Show preview of the mask.
@@ -77,7 +791,9 @@ class SLM:
             ([3,] N_height, N_width) non-negative reals.
             Interpretation of the optional 0-th dimension is class-dependent.
         """
-        pass
+        if self._preview_sink is None:
+            self._preview_sink = WindowPreview(title=type(self).__name__)
+        self._preview_sink.update(I)
 
     def _handle_preview(self, I):
         """
@@ -92,13 +808,68 @@ class SLM:
         preview = self._preview if self._slm else True
 
         if preview:
-            print("Plotting preview...")
-            self._show_preview(I)
+            deferred = getattr(_deferred_previews, "previews", None)
+            if deferred is not None:
+                deferred.append((self, I))
+                return
+
+            logger.debug("Plotting preview...")
+            with self._metrics.time("preview"):
+                self._show_preview(I)
+                self._hold_preview()
+
+    def _preview_time(self):
+        """
+        Returns
+        -------
+        time : float or None
+            Time [s] for which a preview is kept on screen before the display
+            call returns, None until the user closes it.
+        """
+        return 0.0
+
+    def _hold_preview(self):
+        """
+        Keep the latest preview on screen for `_preview_time`.
+        """
+        hold = self._preview_time()
+        if hold != 0:
+            self._preview_sink.wait(hold)
+
+    async def _ahold_preview(self, poll=0.02):
+        """
+        Asynchronous counterpart of `_hold_preview`, keeping the preview window
+        responsive without blocking the event loop.
+        """
+        import asyncio
+
+        hold = self._preview_time()
+        if hold == 0:
+            return
+        sink = self._preview_sink
+        deadline = None if hold is None else time.perf_counter() + hold
+        while True:
+            if deadline is None:
+                if not sink.is_open:
+                    return
+                remaining = poll
+            else:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return
+            sink.refresh()
+            await asyncio.sleep(min(poll, remaining))
 
 
 class AdafruitSLM(SLM):
     def __init__(
-        self, cs_pin=None, dc_pin=None, reset_pin=None, rotation=90, baudrate=24000000,
+        self,
+        cs_pin=None,
+        dc_pin=None,
+        reset_pin=None,
+        rotation=90,
+        baudrate=24000000,
+        simulate=False,
     ):
         """
         Object to display images on the Adafruit 1.8 inch TFT Display Breakout with a Raspberry Pi:
@@ -116,14 +887,62 @@ class AdafruitSLM(SLM):
             Rotation of image on the display.
         baudrate : int
             Baud rate.
+        simulate : bool or :py:class:`~slm_controller.simulated.SimulatedST7735R`
+            Whether to drive a simulated display instead of the hardware, or the
+            simulated display to drive.
         """
         super().__init__()
 
         if rotation not in (0, 90, 180, 270):
             raise ValueError("Rotation must be 0/90/180/270")
 
+        self._frame_rate = slm_devices[SLMDevices.ADAFRUIT.value].get(SLMParam.FRAME_RATE)
+        self._config = (cs_pin, dc_pin, reset_pin, rotation, baudrate)
+        self._simulate = simulate
+        self.open()
+
+    @property
+    def mask_shape(self):
+        return (3, *self.shape)
+
+    def _open(self):
         self._height, self._width = slm_devices[SLMDevices.ADAFRUIT.value][SLMParam.SLM_SHAPE]
+        rotation, baudrate = self._config[3:]
+
+        if self._simulate:
+            from slm_controller.simulated import SimulatedST7735R
+
+            simulate = self._simulate
+            if simulate is True:
+                simulate = SimulatedST7735R(rotation=rotation, baudrate=baudrate)
+            self._slm, self._resources = simulate, []
+        else:
+            self._slm, self._resources = self._open_display(*self._config)
+
+        if self._slm:
+            if self._slm.rotation % 180 == 90:
+                self._width = self._slm.height
+                self._height = self._slm.width
+            else:
+                self._width = self._slm.width
+                self._height = self._slm.height
+
+        self._encoder = RGB565Encoder(self.shape, rotation=rotation)
 
+        # last frame sent to the display, RGB565 in display orientation, None if unknown
+        self._last_encoded = None
+        # (future, roi) of the last update submitted in asynchronous mode, roi
+        # being None for a full frame or a clear
+        self._last_update = None
+
+    def _close(self):
+        # the SPI bus of `board.SPI` is shared, only the pins are released
+        for resource in self._resources:
+            resource.deinit()
+        self._resources = []
+
+    @staticmethod
+    def _open_display(cs_pin, dc_pin, reset_pin, rotation, baudrate):
         try:
             import board
             import adafruit_rgb_display.st7735 as st7735
@@ -142,49 +961,45 @@ class AdafruitSLM(SLM):
             spi = board.SPI()
 
             # Create interface with board
-            self._slm = st7735.ST7735R(
-                spi, rotation=rotation, cs=cs_pin, dc=dc_pin, rst=reset_pin, baudrate=baudrate,
+            display = st7735.ST7735R(
+                spi,
+                rotation=rotation,
+                cs=cs_pin,
+                dc=dc_pin,
+                rst=reset_pin,
+                baudrate=baudrate,
             )
-
-            if self._slm.rotation % 180 == 90:
-                self._width = self._slm.height
-                self._height = self._slm.width
-            else:
-                self._width = self._slm.width
-                self._height = self._slm.height
+            return display, [cs_pin, dc_pin, reset_pin]
         except Exception:
-            self._slm = None
             warnings.warn("Failed to load SLM. Using virtual device...")
+            return None, []
 
     def clear(self):
         """
         Clear SLM.
+
+        Returns
+        -------
+        future : :py:class:`~concurrent.futures.Future` or None
+            Future of the call in asynchronous mode, None otherwise.
         """
+        self._check_open()
         if self._slm:
-            I = Image.new("RGB", (self.width, self.height))
-
-            # Get drawing object to draw on image.
-            draw = ImageDraw.Draw(I)
-
-            # Draw a black filled box to clear the image.
-            draw.rectangle((0, 0, self.width, self.height), outline=0, fill=(0, 0, 0))
-
-            self._slm.image(I)
+            return self._track_update(self._submit(self._clear), None)
 
-    def _show_preview(self, I):
-        _, ax = plt.subplots()
-        if len(I.shape) == 3:
-            # if RGB, put channel dim in right place
-            I = I.transpose(1, 2, 0)
-            ax.imshow(I)
-        else:
-            ax.imshow(I, cmap="gray")
-        plt.show()
+    def _clear(self):
+        if self._slm:
+            with self._metrics.time("clear"):
+                self._slm.fill(0)
+            self._last_encoded = np.zeros(self._encoder.display_shape, dtype=">u2")
 
-    def imshow(self, I):
+    def imshow(self, I, roi=None):
         """
         Display RGB or Grayscale data as an image.
 
+        Only the regions that differ from the previously displayed mask are
+        sent to the display.
+
         Parameters
         ----------
         I : :py:class:`~numpy.ndarray`
@@ -192,28 +1007,136 @@ class AdafruitSLM(SLM):
 
             2D inputs are interpreted as grayscale.
             3D inputs are interpreted as RGB.
+        roi : tuple(int), optional
+            (row_start, col_start, row_stop, col_stop) region of `I` that
+            changed since the previous mask. If given, only this region is sent
+            and the comparison with the previous mask is skipped. In
+            asynchronous mode, an update superseded before reaching the display
+            is covered by the next one: its region is added to the next region,
+            or the next mask is compared with the display if it was a full
+            frame.
+
+        Returns
+        -------
+        future : :py:class:`~concurrent.futures.Future` or None
+            Future resolving once the mask is on the display in asynchronous
+            mode, None otherwise.
+        """
+        if roi is not None and self._worker is not None:
+            roi = self._cover_superseded(roi)
+        if roi is None:
+            return super().imshow(I)
+
+        metrics = self._metrics
+        with metrics.time("imshow"):
+            with metrics.time("validate"):
+                self._check_mask(I)
+                row_start, col_start, row_stop, col_stop = roi
+                assert 0 <= row_start < row_stop <= self.height
+                assert 0 <= col_start < col_stop <= self.width
+
+            self._handle_preview(I)
+
+            if self._slm:
+                with metrics.time("encode"):
+                    window = self._encoder.display_window(roi)
+                    try:
+                        encoded = self._encoder.encode(I, window)
+                    except Exception as e:
+                        raise ValueError("Parameter[I]: unsupported data") from e
+                metrics.increment("frames")
+                future = self._submit(functools.partial(self._show_encoded, window=window), encoded)
+                return self._track_update(future, roi)
+
+    def _present(self, data):
+        return self._track_update(super()._present(data), None)
+
+    def _track_update(self, future, roi):
+        """
+        Remember the last update submitted in asynchronous mode, see
+        `_cover_superseded`.
+        """
+        self._last_update = (future, roi) if future is not None else None
+        return future
+
+    def _cover_superseded(self, roi):
         """
+        Region to send so that an update about to be superseded, i.e. still
+        waiting for the worker, is not lost: the union with its region, or None
+        to compare the whole mask with the display if it was a full frame.
+        """
+        if self._last_update is None:
+            return roi
+        future, pending = self._last_update
+        if future.running() or future.done():
+            return roi
+        if pending is None:
+            return None
+        return (
+            min(roi[0], pending[0]),
+            min(roi[1], pending[1]),
+            max(roi[2], pending[2]),
+            max(roi[3], pending[3]),
+        )
+
+    def _check_mask(self, I):
         assert isinstance(I, np.ndarray) and np.issubdtype(I.dtype, np.uint8)
         assert I.shape[-2:] == self.shape
 
-        self._handle_preview(I)
+    def _encode(self, I):
+        return self._encoder.encode(I)
 
-        if self._slm:
-            self.clear()
+    def _show_encoded(self, encoded, window=None):
+        if window is not None:
+            windows = [(window, encoded)]
+        elif self._last_encoded is None:
+            windows = [((0, 0, *encoded.shape), encoded)]
+        else:
+            windows = [
+                (window, encoded[window[0] : window[2], window[1] : window[3]])
+                for window in _dirty_rectangles(self._last_encoded, encoded)
+            ]
 
-            try:
-                I = np.broadcast_to(I, (3, *I.shape[-2:]))
+        logger.debug("Program mask onto the physical SLM.")
+        try:
+            with self._metrics.time("transfer"):
+                for (row_start, col_start, row_stop, col_stop), data in windows:
+                    self._write_window(row_start, col_start, row_stop, col_stop, data)
+                    if self._last_encoded is not None:
+                        self._last_encoded[row_start:row_stop, col_start:col_stop] = data
+            if window is None and self._last_encoded is None:
+                self._last_encoded = encoded.copy()
+        except Exception:
+            # the display content is unknown after a failed transfer
+            self._last_encoded = None
+            raise
+
+    def _write_window(self, row_start, col_start, row_stop, col_stop, data):
+        """
+        Write RGB565 pixels to a window of the display, through the ST7735
+        column/row address set and memory write commands.
 
-                I_p = Image.fromarray(I.transpose(1, 2, 0), mode="RGB")
-                print("Program mask onto the physical SLM.")
-                self._slm.image(I_p)
-            except Exception as e:
-                raise ValueError("Parameter[I]: unsupported data") from e
+        Parameters
+        ----------
+        row_start, col_start, row_stop, col_stop : int
+            Window in display coordinates, stop excluded.
+        data : :py:class:`~numpy.ndarray`
+            (row_stop - row_start, col_stop - col_start) encoded pixels.
+        """
+        self._slm._block(col_start, row_start, col_stop - 1, row_stop - 1, as_bytes(data))
+        self._metrics.increment("bytes", data.nbytes)
 
 
 class NokiaSLM(SLM):
     def __init__(
-        self, dc_pin=None, cs_pin=None, reset_pin=None, contrast=80, bias=4, baudrate=1000000,
+        self,
+        dc_pin=None,
+        cs_pin=None,
+        reset_pin=None,
+        contrast=80,
+        bias=4,
+        baudrate=1000000,
+        simulate=False,
     ):
         """
         Object to display images on the Nokia 5110 monochrome display with a Raspberry Pi:
@@ -233,11 +1156,40 @@ class NokiaSLM(SLM):
             Display bias.
         baudrate : int
             Baud rate.
+        simulate : bool or :py:class:`~slm_controller.simulated.SimulatedPCD8544`
+            Whether to drive a simulated display instead of the hardware, or the
+            simulated display to drive.
         """
         super().__init__()
 
         self._height, self._width = slm_devices[SLMDevices.NOKIA_5110.value][SLMParam.SLM_SHAPE]
+        self._frame_rate = slm_devices[SLMDevices.NOKIA_5110.value].get(SLMParam.FRAME_RATE)
+        self._config = (dc_pin, cs_pin, reset_pin, contrast, bias, baudrate)
+        self._simulate = simulate
+        self._encoder = PCD8544Encoder(self.shape)
+        self.open()
+
+    def _open(self):
+        if self._simulate:
+            from slm_controller.simulated import SimulatedPCD8544
+
+            simulate = self._simulate
+            if simulate is True:
+                simulate = SimulatedPCD8544(baudrate=self._config[-1])
+            self._slm, self._resources = simulate, []
+        else:
+            self._slm, self._resources = self._open_display(*self._config)
+
+        # frame buffer last sent to the display, None if unknown
+        self._last_encoded = None
 
+    def _close(self):
+        for resource in self._resources:
+            resource.deinit()
+        self._resources = []
+
+    @staticmethod
+    def _open_display(dc_pin, cs_pin, reset_pin, contrast, bias, baudrate):
         try:
             import board
             import busio
@@ -252,7 +1204,7 @@ class NokiaSLM(SLM):
             dc_pin = digitalio.DigitalInOut(dc_pin)  # data/command
             cs_pin = digitalio.DigitalInOut(cs_pin)  # Chip select
             reset_pin = digitalio.DigitalInOut(reset_pin)  # reset
-            self._slm = adafruit_pcd8544.PCD8544(
+            display = adafruit_pcd8544.PCD8544(
                 spi=spi,
                 dc_pin=dc_pin,
                 cs_pin=cs_pin,
@@ -261,23 +1213,31 @@ class NokiaSLM(SLM):
                 bias=bias,
                 baudrate=baudrate,
             )
+            return display, [dc_pin, cs_pin, reset_pin, spi]
 
         except Exception:
-            self._slm = None
             warnings.warn("Failed to load SLM. Using virtual device...")
+            return None, []
 
     def clear(self):
         """
         Clear SLM.
+
+        Returns
+        -------
+        future : :py:class:`~concurrent.futures.Future` or None
+            Future of the call in asynchronous mode, None otherwise.
         """
+        self._check_open()
         if self._slm:
-            self._slm.fill(1)
-            self._slm.show()
+            return self._submit(self._clear)
 
-    def _show_preview(self, I):
-        _, ax = plt.subplots()
-        ax.imshow(I, cmap="gray")
-        plt.show()
+    def _clear(self):
+        if self._slm:
+            with self._metrics.time("clear"):
+                self._slm.fill(1)
+                self._slm.show()
+            self._last_encoded = np.full(self._encoder.display_shape, 0xFF, dtype=np.uint8)
 
     def imshow(self, I):
         """
@@ -287,52 +1247,184 @@ class NokiaSLM(SLM):
         ----------
         I : :py:class:`~numpy.ndarray`
             (N_height, N_width) monochrome data.
+
+        Returns
+        -------
+        future : :py:class:`~concurrent.futures.Future` or None
+            Future resolving once the mask is on the display in asynchronous
+            mode, None otherwise.
         """
-        assert isinstance(I, np.ndarray) and np.issubdtype(I.dtype, np.uint8)
-        assert I.shape == self.shape
+        return super().imshow(I)
+
+    def show_grayscale(self, I, duration=1.0, n_bits=4, base_time=None):
+        """
+        Display gray levels on the binary display by temporal bit-plane
+        modulation: the bit planes of the mask are shown one after the other,
+        each for a time proportional to its weight, so that the time-averaged
+        intensity follows the gray level.
 
+        The planes are encoded once and sent as whole frame buffers, and the
+        call blocks for the whole run.
+
+        Parameters
+        ----------
+        I : :py:class:`~numpy.ndarray`
+            (N_height, N_width) uint8 gray levels, 0 being dark.
+        duration : float
+            Minimum duration [s] of the modulation, rounded up to complete
+            cycles through the planes.
+        n_bits : int
+            Number of most significant bits shown.
+        base_time : float, optional
+            Display time [s] of the least significant plane, by default the
+            longest transfer time of a plane, i.e. the fastest cycle the SPI
+            link sustains.
+
+        Returns
+        -------
+        stats : :py:class:`~slm_controller.playback.BitPlaneStats`
+            Loop timing, from which the fidelity of the displayed gray levels
+            can be checked. None for a virtual device.
+        """
+        self._check_open()
+        with self._metrics.time("validate"):
+            self._check_mask(I)
         self._handle_preview(I)
 
-        if self._slm:
-            self.clear()
+        if not self._slm:
+            time.sleep(duration)
+            return None
 
-            try:
-                I = 255 - I
-                I = I.T
+        with self._metrics.time("encode"):
+            # bright pixels are clear, i.e. encoded from 255
+            planes = [
+                self._encoder.encode(np.where(plane, 255, 0).astype(np.uint8)).copy()
+                for plane in bit_planes(I, n_bits)
+            ]
 
-                I_p = Image.fromarray(I).convert("1")
-                self._slm.image(I_p)
-                print("Program mask onto the physical SLM.")
-                self._slm.show()
+        # the planes are written from this thread, after any pending mask
+        self.wait_presented()
 
-            except Exception as e:
-                raise ValueError("Parameter[I]: unsupported data") from e
+        def show(k):
+            with self._metrics.time("transfer"):
+                self._write_bank(0, 0, planes[k])
+            self._metrics.increment("frames")
+
+        try:
+            if base_time is None:
+                base_time = 0.0
+                for k in range(n_bits):
+                    start = time.perf_counter()
+                    show(k)
+                    base_time = max(base_time, time.perf_counter() - start)
+            stats = playback.cycle_bit_planes(show, n_bits, base_time, duration)
+        except Exception:
+            self._last_encoded = None
+            raise
+        self._last_encoded = planes[-1]
+        return stats
+
+    def _encode(self, I):
+        return self._encoder.encode(I)
+
+    def _show_encoded(self, encoded):
+        logger.debug("Program mask onto the physical SLM.")
+        try:
+            with self._metrics.time("transfer"):
+                if self._last_encoded is None:
+                    # whole frame buffer in one go, the address wraps to the next bank
+                    self._write_bank(0, 0, encoded)
+                    self._last_encoded = encoded.copy()
+                    return
+
+                for bank in np.flatnonzero((encoded != self._last_encoded).any(axis=1)):
+                    cols = np.flatnonzero(encoded[bank] != self._last_encoded[bank])
+                    data = encoded[bank, cols[0] : cols[-1] + 1]
+                    self._write_bank(bank, cols[0], data)
+                    self._last_encoded[bank, cols[0] : cols[-1] + 1] = data
+        except Exception:
+            # the display content is unknown after a failed transfer
+            self._last_encoded = None
+            raise
+
+    def _write_bank(self, bank, col, data):
+        """
+        Write frame buffer bytes to the display, starting at a bank and column.
+
+        `adafruit_pcd8544.PCD8544` only writes its whole buffer (`show`), so
+        the data is written as it does, through its data/command pin and SPI
+        device.
+
+        Parameters
+        ----------
+        bank : int
+            Bank, i.e. group of 8 display rows, to start at.
+        col : int
+            Column to start at.
+        data : :py:class:`~numpy.ndarray`
+            uint8 frame buffer bytes.
+        """
+        self._slm.write_cmd(_PCD8544_SETYADDR | int(bank))
+        self._slm.write_cmd(_PCD8544_SETXADDR | int(col))
+        self._slm._dc_pin.value = 1
+        with self._slm.spi_device as spi:
+            spi.write(as_bytes(data))
+        self._metrics.increment("bytes", data.nbytes)
 
 
 class HoloeyeSLM(SLM):
-    def __init__(self):
+    def __init__(self, sdk=None, simulate=False):
         """
         Initialize a new holoeye SLM instance
+
+        Parameters
+        ----------
+        sdk : module, optional
+            Module providing the API of the HOLOEYE SLM Display SDK, by default
+            `holoeye.slmdisplaysdk`. A stand-in module can be passed to exercise
+            the driver without the device.
+        simulate : bool
+            Whether to use the simulated SDK of
+            :py:func:`slm_controller.simulated.holoeye_sdk` when `sdk` is not
+            given.
         """
         super().__init__()
 
-        try:
-            import slm_controller.holoeye_sdk.detect_heds_module_path
-            from holoeye import slmdisplaysdk
+        if sdk is None and simulate:
+            from slm_controller.simulated import holoeye_sdk
 
-            self._slmdisplaysdk = slmdisplaysdk
-        except Exception:
-            self._slmdisplaysdk = None
-            self._slm = None
-            warnings.warn("Failed to import Holoeye SLM SDK. Using virtual device...")
+            sdk = holoeye_sdk()
+
+        if sdk is not None:
+            self._slmdisplaysdk = sdk
+        else:
+            try:
+                import slm_controller.holoeye_sdk.detect_heds_module_path
+                from holoeye import slmdisplaysdk
+
+                self._slmdisplaysdk = slmdisplaysdk
+            except Exception:
+                self._slmdisplaysdk = None
+                self._slm = None
+                warnings.warn("Failed to import Holoeye SLM SDK. Using virtual device...")
 
         # Initialize parameters of the holoeye SLM display
         self._height, self._width = slm_devices[SLMDevices.HOLOEYE_LC_2012.value][
             SLMParam.SLM_SHAPE
         ]
+        self._frame_rate = slm_devices[SLMDevices.HOLOEYE_LC_2012.value].get(SLMParam.FRAME_RATE)
 
         self._show_time = None
 
+        # masks uploaded with `load_sequence`, as (data handle, duration in frames, mask)
+        self._loaded = []
+        self._sequence_executor = None
+        self._sequence_stop = threading.Event()
+
+        self.open()
+
+    def _open(self):
+        self._slm = None
         if self._slmdisplaysdk:
             try:
                 # Similar to: https://github.com/computational-imaging/neural-holography/blob/d2e399014aa80844edffd98bca34d2df80a69c84/utils/slm_display_module.py#L19
@@ -368,12 +1460,164 @@ class HoloeyeSLM(SLM):
                     warnings.warn(f"Failed to load SLM: {message} Using virtual device...")
                     self._slm = None
 
+    def _close(self):
+        self.release_sequence()
+        if self._slm:
+            self._slm.close()
+
     def __del__(self):
         """
-        Destructor
+        Destructor, closing the SDK window if `close` was not called.
+        """
+        if not getattr(self, "_closed", True):
+            self.close()
+
+    def set_asynchronous(self, asynchronous):
+        """
+        Asynchronous display is only available for the SPI displays.
+        """
+        if asynchronous:
+            raise NotImplementedError("Asynchronous display is not supported by the Holoeye SLM.")
+
+    def load_sequence(self, masks, durations=None):
+        """
+        Upload masks to the SDK once, so that they can then be shown by index
+        with `show_loaded` or `play_loaded`, without uploading them again or
+        blanking the SLM in between.
+
+        Parameters
+        ----------
+        masks : iterable(np.ndarray)
+            Masks to upload, appended to those already loaded.
+        durations : float or list(float), optional
+            Time [s] each mask stays on the SLM when played with `play_loaded`,
+            either one for all masks or one per mask. Durations are rounded to
+            whole frames, of at least one frame, which is also the default.
+
+        Returns
+        -------
+        indices : list(int)
+            Indices of the uploaded masks.
+        """
+        self._check_open()
+        indices = []
+        for k, I in enumerate(masks):
+            self._check_mask(I)
+
+            if durations is None:
+                duration = 1 / self._frame_rate
+            elif np.ndim(durations) == 0:
+                duration = durations
+            else:
+                duration = durations[k]
+            n_frames = max(1, int(round(duration * self._frame_rate)))
+
+            handle = None
+            if self._slm:
+                error, handle = self._slm.loadData(np.ascontiguousarray(I))
+                self._check_error(error)
+                handle.durationInFrames = n_frames
+                error = self._slm.updateDatahandle(
+                    handle, self._slmdisplaysdk.ApplyDataHandleValue.DurationInFrames
+                )
+                self._check_error(error)
+
+            # masks are only kept on our side if they can be previewed
+            mask = np.array(I) if (self._preview or not self._slm) else None
+
+            indices.append(len(self._loaded))
+            self._loaded.append((handle, n_frames, mask))
+        return indices
+
+    def show_loaded(self, index):
+        """
+        Show a mask uploaded with `load_sequence`. Returns as soon as the SDK
+        has switched to it.
+
+        Parameters
+        ----------
+        index : int
+            Index returned by `load_sequence`.
+        """
+        self._check_open()
+        handle, _, mask = self._loaded[index]
+        if mask is not None:
+            self._handle_preview(mask)
+
+        if self._slm:
+            with self._metrics.time("transfer"):
+                self._check_error(self._slm.showDatahandle(handle, self._show_flags))
+            self._metrics.increment("frames")
+
+    def play_loaded(self, indices=None):
+        """
+        Show masks uploaded with `load_sequence` one after the other, each for
+        its duration, from a background thread. Returns immediately.
+
+        Sequences are played in the order in which they are requested. Masks
+        played in the background are not previewed.
+
+        Parameters
+        ----------
+        indices : list(int), optional
+            Indices of the masks to show, by default all loaded masks in order.
+
+        Returns
+        -------
+        future : :py:class:`~concurrent.futures.Future`
+            Resolves to the number of masks shown once the sequence is over or
+            stopped with `stop_sequence`.
+        """
+        self._check_open()
+        indices = range(len(self._loaded)) if indices is None else list(indices)
+        for index in indices:
+            assert 0 <= index < len(self._loaded)
+
+        if self._sequence_executor is None:
+            self._sequence_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="holoeye-sequence"
+            )
+        self._sequence_stop.clear()
+        return self._sequence_executor.submit(self._play_loaded, indices)
+
+    def stop_sequence(self):
+        """
+        Stop sequences started with `play_loaded` after their current mask.
         """
+        self._sequence_stop.set()
+
+    def release_sequence(self):
+        """
+        Stop playing and free all masks uploaded with `load_sequence`.
+        """
+        if self._sequence_executor is not None:
+            self.stop_sequence()
+            self._sequence_executor.shutdown(wait=True)
+            self._sequence_executor = None
+
         if self._slm:
-            del self._slm
+            for handle, _, _ in self._loaded:
+                self._check_error(self._slm.releaseDatahandle(handle))
+        self._loaded = []
+
+    def _play_loaded(self, indices):
+        n_shown = 0
+        for index in indices:
+            if self._sequence_stop.is_set():
+                break
+
+            handle, n_frames, _ = self._loaded[index]
+            if self._slm:
+                # the SDK keeps each data handle on screen for its duration
+                self._check_error(self._slm.showDatahandle(handle, self._show_flags))
+                self._metrics.increment("frames")
+            else:
+                time.sleep(n_frames / self._frame_rate)
+            n_shown += 1
+        return n_shown
+
+    def _check_error(self, error):
+        assert error == self._slmdisplaysdk.ErrorCode.NoError, self._slm.errorString(error)
 
     def set_show_time(self, time=None):
         """
@@ -392,34 +1636,21 @@ class HoloeyeSLM(SLM):
         """
         Clear SLM aka show black screen.
         """
+        self._check_open()
         if self._slm:
             # Configure the blank screen value
             black = 0
 
             # Show blank mask on SLM
-            error = self._slm.showBlankscreen(black)
+            with self._metrics.time("clear"):
+                error = self._slm.showBlankscreen(black)
 
             # And check that no error occurred
             assert error == self._slmdisplaysdk.ErrorCode.NoError, self._slm.errorString(error)
 
-    def _show_preview(self, I):
-        # Use a virtual device, plot
-        fig, ax = plt.subplots()
-
-        if self._show_time is not None:
-
-            def on_timeout():
-                plt.close()
-
-            timer = fig.canvas.new_timer(interval=self._show_time * 1000)
-            timer.add_callback(on_timeout)
-
-            ax.imshow(I, cmap="gray")
-            timer.start()
-            plt.show()
-        else:
-            ax.imshow(I, cmap="gray")
-            plt.show()
+    def _preview_time(self):
+        # a virtual device shows the mask for the show time, like the SDK
+        return self._show_time if not self._slm else 0.0
 
     def imshow(self, I):
         """
@@ -430,54 +1661,163 @@ class HoloeyeSLM(SLM):
         I : np.ndarray
             The mask to show on the SLM.
         """
-        # Check that the mask is valid
-        assert isinstance(I, np.ndarray) and np.issubdtype(I.dtype, np.uint8)
-        assert I.shape == self.shape
+        return super().imshow(I)
 
-        self._handle_preview(I)
+    def _encode(self, I):
+        # the SDK takes the mask as is
+        return np.ascontiguousarray(I)
 
-        # If using a physical device
-        if self._slm:
-            # Reset devices mask
-            self.clear()
+    def _show_encoded(self, data):
+        # Reset devices mask
+        self.clear()
 
-            # Show mask on SLM
-            error = self._slm.showData(I, self._show_flags)
+        # Show mask on SLM
+        with self._metrics.time("transfer"):
+            error = self._slm.showData(data, self._show_flags)
+        self._transferred = time.perf_counter()
+        self._metrics.increment("bytes", data.nbytes)
 
-            # And check that no error occurred
-            assert error == self._slmdisplaysdk.ErrorCode.NoError, self._slm.errorString(error)
+        # And check that no error occurred
+        assert error == self._slmdisplaysdk.ErrorCode.NoError, self._slm.errorString(error)
 
-            print("Program mask onto the physical SLM.")
+        logger.debug("Program mask onto the physical SLM.")
 
+        with self._metrics.time("wait"):
             if self._show_time is None:
                 # Wait until the SLM process is closed:
-                print(
+                logger.warning(
                     "Waiting for SDK process to close. Please close the tray icon to continue ..."
                 )
                 error = self._slm.utilsWaitUntilClosed()
             else:
                 error = self._slm.utilsWaitForCheckedS(self._show_time)
 
-            assert error == self._slmdisplaysdk.ErrorCode.NoError, self._slm.errorString(error)
+        assert error == self._slmdisplaysdk.ErrorCode.NoError, self._slm.errorString(error)
+
+
+# Entry point group under which other packages can provide SLM drivers, e.g. in
+# their setup.py: entry_points={"slm_controller.drivers": ["my_slm = my_package:MySLM"]}
+ENTRY_POINT_GROUP = "slm_controller.drivers"
 
+_drivers = {}
 
-def create(device_key):
+# devices created with `create(..., reuse=True)`, by device key and arguments
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def register(device_key, driver=None):
+    """
+    Register an SLM driver so that it can be instantiated with `create`.
+
+    Can also be used as a class decorator, i.e. `@register("my_slm")`.
+
+    Parameters
+    ----------
+    device_key : str
+        Key passed to `create` to select the driver.
+    driver : callable
+        `SLM` subclass or factory returning an `SLM` object.
+    """
+
+    def decorator(driver):
+        _drivers[device_key] = driver
+        return driver
+
+    if driver is None:
+        return decorator
+    return decorator(driver)
+
+
+def _entry_points():
+    """
+    Entry points of the driver group, without loading them.
+    """
+    from importlib.metadata import entry_points
+
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        return list(eps.select(group=ENTRY_POINT_GROUP))
+    return list(eps.get(ENTRY_POINT_GROUP, []))
+
+
+def available_devices():
+    """
+    Returns
+    -------
+    keys : list(str)
+        Device keys accepted by `create`, both registered and provided through
+        entry points.
+    """
+    keys = list(_drivers)
+    keys += [ep.name for ep in _entry_points() if ep.name not in _drivers]
+    return keys
+
+
+def create(device_key, reuse=False, **kwargs):
     """
     Factory method to create `SLM` object.
 
+    Drivers of this package are registered under the options of `SLMDevices`.
+    Drivers of other packages are looked up, and only then imported, among the
+    entry points of the `slm_controller.drivers` group.
+
     Parameters
     ----------
     device_key : str
-        Option from `SlmDevices`.
+        Option from `SlmDevices`, or key of a registered driver.
+    reuse : bool
+        Return the session created earlier in this process for the same
+        device key and arguments, if any, instead of initializing the device
+        again, e.g. in notebooks re-running their setup. The session is
+        returned open, in the state its previous user left it. Sessions are
+        closed at exit, or with `close_sessions`.
+    **kwargs
+        Passed to the driver's constructor. Must be hashable if `reuse`.
     """
-    assert device_key in SLMDevices.values()
-
-    slm_device = None
-    if device_key == SLMDevices.ADAFRUIT.value:
-        slm_device = AdafruitSLM()
-    elif device_key == SLMDevices.NOKIA_5110.value:
-        slm_device = NokiaSLM()
-    elif device_key == SLMDevices.HOLOEYE_LC_2012.value:
-        slm_device = HoloeyeSLM()
-    assert slm_device is not None
-    return slm_device
+    if device_key not in _drivers:
+        for ep in _entry_points():
+            if ep.name == device_key:
+                register(device_key, ep.load())
+                break
+        else:
+            raise ValueError(
+                f"Unknown SLM device: {device_key}. Available: {', '.join(available_devices())}."
+            )
+
+    if not reuse:
+        return _drivers[device_key](**kwargs)
+
+    key = (device_key, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+    except TypeError as e:
+        raise ValueError("Parameter[kwargs]: arguments must be hashable to reuse a session.") from e
+
+    with _sessions_lock:
+        device = _sessions.get(key)
+        if device is None:
+            device = _sessions[key] = _drivers[device_key](**kwargs)
+        elif getattr(device, "closed", False):
+            device.open()
+    return device
+
+
+def close_sessions():
+    """
+    Close the sessions kept by `create(..., reuse=True)` and forget them.
+    """
+    with _sessions_lock:
+        devices = list(_sessions.values())
+        _sessions.clear()
+    for device in devices:
+        close = getattr(device, "close", None)
+        if close is not None:
+            close()
+
+
+register(SLMDevices.ADAFRUIT.value, AdafruitSLM)
+register(SLMDevices.NOKIA_5110.value, NokiaSLM)
+register(SLMDevices.HOLOEYE_LC_2012.value, HoloeyeSLM)
+
+atexit.register(close_sessions)
@@ -0,0 +1,239 @@
+"""
+Lazy frame sources, streaming masks from files too large to load up front.
+
+Sources yield frames in the ([N_channel,] N_height, N_width) layout of the rest
+of the package, one at a time:
+
+- `.npy` stacks, through a memory map,
+- sequence files of :py:mod:`slm_controller.sequence`,
+- animated GIFs and multi-page TIFFs, decoded frame by frame with PIL,
+- videos, decoded with `imageio` (optional dependency, with its ffmpeg plugin).
+
+`stream` resizes and quantizes the frames of a source to a device in a small
+pool of worker threads, so that they can be passed to `SLM.imshow` or
+`SLM.play` directly.
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from slm_controller.hardware import SLMParam, slm_devices
+from slm_controller.resample import get_plan
+from slm_controller.sequence import MAGIC, SequenceReader
+from slm_controller.utils import quantize_for_device
+
+_VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v")
+
+# sentinel closing the queue of pending frames
+_END = object()
+
+
+def iter_npy(fname):
+    """
+    Frames of a `.npy` file, read through a memory map.
+
+    Parameters
+    ----------
+    fname : str, path-like
+        (N_frame, [N_channel,] N_height, N_width) stack, or a single
+        ([N_channel,] N_height, N_width) image if 2D.
+
+    Yields
+    ------
+    frame : :py:class:`~numpy.ndarray`
+        Read-only view of the frame in the memory map.
+    """
+    frames = np.load(fname, mmap_mode="r")
+    if frames.ndim == 2:
+        frames = frames[np.newaxis]
+    yield from frames
+
+
+def iter_sequence(fname):
+    """
+    Frames of a sequence file written with
+    :py:class:`~slm_controller.sequence.SequenceWriter`.
+    """
+    with SequenceReader(fname) as reader:
+        yield from reader
+
+
+def iter_image_frames(fname):
+    """
+    Frames of an animated GIF, multi-page TIFF or any other image file PIL can
+    read, decoded one at a time.
+
+    Yields
+    ------
+    frame : :py:class:`~numpy.ndarray`
+        ([N_channel,] N_height, N_width) frame. Palette frames are converted to
+        RGB.
+    """
+    from PIL import Image, ImageSequence
+
+    with Image.open(fname) as image:
+        for frame in ImageSequence.Iterator(image):
+            if frame.mode in ("P", "PA"):
+                frame = frame.convert("RGB")
+            yield _channels_first(np.asarray(frame))
+
+
+def iter_video(fname):
+    """
+    Frames of a video file, decoded one at a time with `imageio`.
+
+    Yields
+    ------
+    frame : :py:class:`~numpy.ndarray`
+        (3, N_height, N_width) RGB frame.
+    """
+    try:
+        import imageio.v3 as iio
+    except ImportError as e:
+        raise ImportError("Reading videos requires `imageio` and `imageio-ffmpeg`.") from e
+
+    for frame in iio.imiter(fname):
+        yield _channels_first(frame)
+
+
+def _channels_first(I):
+    return I.transpose(2, 0, 1) if I.ndim == 3 else I
+
+
+def open_source(fname):
+    """
+    Lazy frame source for a file, chosen from its extension and content.
+
+    Parameters
+    ----------
+    fname : str, path-like
+        `.npy` stack, sequence file, video, or image file (GIF, TIFF, ...).
+
+    Returns
+    -------
+    frames : iterator(:py:class:`~numpy.ndarray`)
+        ([N_channel,] N_height, N_width) frames.
+    """
+    fname = os.fspath(fname)
+    extension = os.path.splitext(fname)[1].lower()
+    if extension == ".npy":
+        return iter_npy(fname)
+    if extension in _VIDEO_EXTENSIONS:
+        return iter_video(fname)
+    with open(fname, "rb") as f:
+        if f.read(len(MAGIC)) == MAGIC:
+            return iter_sequence(fname)
+    return iter_image_frames(fname)
+
+
+def stream(
+    source,
+    device_key,
+    keep_aspect_ratio=True,
+    grayscale=None,
+    normalize="global",
+    dither=None,
+    n_workers=2,
+    max_pending=8,
+):
+    """
+    Convert the frames of a source to masks for a device, on the fly.
+
+    Frames are read in a background thread and resized and quantized by a pool
+    of `n_workers` threads. At most `max_pending` frames are read ahead of the
+    consumer, which bounds memory use whatever the length of the source.
+
+    Parameters
+    ----------
+    source : str, path-like or iterable
+        File, see `open_source`, or iterable of ([N_channel,] N_height,
+        N_width) frames.
+    device_key : str
+        Option from `SLMDevices`.
+    keep_aspect_ratio : bool
+        Scale to cover the device and crop the center, rather than stretch.
+    grayscale : bool, optional
+        Convert RGB frames to grayscale, by default for monochrome devices.
+    normalize : "global", "frame" or None
+        See :py:func:`~slm_controller.utils.quantize_for_device`. "global", the
+        default, normalizes by the maximum of the frame dtype, since the source
+        is not read up front, and keeps the brightness of frames relative to
+        each other. "frame" rescales every frame by its own maximum, which
+        brightens dim frames and makes fades flicker.
+    dither : None, "ordered" or "error_diffusion"
+        See :py:func:`~slm_controller.utils.quantize_for_device`.
+    n_workers : int
+        Number of conversion threads.
+    max_pending : int
+        Maximum number of frames read but not yet consumed.
+
+    Yields
+    ------
+    mask : :py:class:`~numpy.ndarray`
+        ([3,] N_height, N_width) uint8 mask for the device, in source order.
+    """
+    assert max_pending >= 1
+    if isinstance(source, (str, os.PathLike)):
+        source = open_source(source)
+    if grayscale is None:
+        grayscale = slm_devices[device_key][SLMParam.MONOCHROME]
+    output_shape = slm_devices[device_key][SLMParam.SLM_SHAPE]
+
+    def convert(frame):
+        if frame.ndim == 3 and frame.shape[0] in (2, 4):
+            # drop the alpha channel
+            frame = frame[:-1] if frame.shape[0] == 4 else frame[0]
+        plan = get_plan(frame.shape, output_shape, keep_aspect_ratio, grayscale)
+        resized = plan.apply(frame)
+        if normalize == "global":
+            # the maximum over the whole source is unknown, use that of the dtype
+            top = np.iinfo(frame.dtype).max if frame.dtype.kind in "ui" else 1.0
+            resized = resized / np.float32(top)
+            return quantize_for_device(resized, device_key, normalize=None, dither=dither)
+        return quantize_for_device(resized, device_key, normalize=normalize, dither=dither)
+
+    pending = queue.Queue(maxsize=max_pending)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    executor = ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="slm-stream")
+
+    def read():
+        try:
+            for frame in source:
+                if not put(executor.submit(convert, frame)):
+                    return
+            put(_END)
+        except BaseException as e:
+            put(e)
+
+    reader = threading.Thread(target=read, name="slm-stream-read", daemon=True)
+    reader.start()
+    try:
+        while True:
+            item = pending.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item.result()
+    finally:
+        stop.set()
+        reader.join()
+        while not pending.empty():
+            item = pending.get()
+            if hasattr(item, "cancel"):
+                item.cancel()
+        executor.shutdown(wait=True)
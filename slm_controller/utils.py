@@ -1,5 +1,11 @@
+import functools
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
-from PIL import Image, ImageOps
+
+from slm_controller.hardware import SLMDevices, SLMParam, slm_devices
 
 
 def load_image(fname, output_shape=None, keep_aspect_ratio=True, grayscale=False):
@@ -24,6 +30,8 @@ def load_image(fname, output_shape=None, keep_aspect_ratio=True, grayscale=False
     if fname.endswith(".npy"):
         return np.load(fname)
     else:
+        from PIL import Image, ImageOps
+
         I_p = Image.open(fname, mode="r")
 
     # rescale and resize if need be
@@ -60,6 +68,123 @@ def load_image(fname, output_shape=None, keep_aspect_ratio=True, grayscale=False
     return I
 
 
+def load_images(
+    paths,
+    output_shape,
+    keep_aspect_ratio=True,
+    grayscale=False,
+    n_workers=None,
+    memmap_fname=None,
+    chunksize=16,
+):
+    """
+    Load many images into a single stacked array, decoding them in parallel.
+
+    Each image is loaded as with :py:func:`load_image`, in a pool of worker
+    processes, and written into one preallocated array.
+
+    Parameters
+    ----------
+    paths : str, path-like or iterable
+        Glob pattern (e.g. "data/*.png") or list of image files.
+    output_shape : tuple(int)
+        Rescale images to (height, width) pixels, see :py:func:`load_image`.
+    keep_aspect_ratio : bool
+        Preserve original image aspect-ratio.
+    grayscale : bool
+        Convert images to grayscale.
+    n_workers : int, optional
+        Number of worker processes, by default the number of CPUs. With 1, images
+        are loaded in the calling process.
+    memmap_fname : str, path-like, optional
+        If given, the output is a memory-mapped `.npy` file at this location,
+        filled directly by the workers, rather than an in-memory array.
+    chunksize : int
+        Number of images handled by a worker per task.
+
+    Returns
+    -------
+    I : :py:class:`~numpy.ndarray`
+        (N_image, [N_channel,] N_height, N_width) images, in the order of
+        `paths` (sorted for a glob pattern).
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        fnames = sorted(glob.glob(os.fspath(paths)))
+    else:
+        fnames = [os.fspath(fname) for fname in paths]
+    if len(fnames) == 0:
+        raise ValueError("Parameter[paths]: no images found.")
+
+    kwargs = dict(
+        output_shape=output_shape, keep_aspect_ratio=keep_aspect_ratio, grayscale=grayscale
+    )
+
+    # the first image determines the shape and dtype of the stack
+    first = load_image(fnames[0], **kwargs)
+    shape = (len(fnames), *first.shape)
+    if memmap_fname is not None:
+        memmap_fname = os.fspath(memmap_fname)
+        I = np.lib.format.open_memmap(memmap_fname, mode="w+", dtype=first.dtype, shape=shape)
+    else:
+        I = np.empty(shape, dtype=first.dtype)
+    I[0] = first
+
+    starts = range(1, len(fnames), chunksize)
+    if n_workers == 1:
+        for start in starts:
+            I[start : start + chunksize] = _load_chunk(
+                fnames[start : start + chunksize], first, kwargs
+            )
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            futures = {
+                start: executor.submit(
+                    _load_chunk,
+                    fnames[start : start + chunksize],
+                    first,
+                    kwargs,
+                    memmap_fname,
+                    start,
+                )
+                for start in starts
+            }
+            for start, future in futures.items():
+                chunk = future.result()
+                if chunk is not None:
+                    I[start : start + len(chunk)] = chunk
+
+    if memmap_fname is not None:
+        I.flush()
+    return I
+
+
+def _load_chunk(fnames, reference, kwargs, memmap_fname=None, start=0):
+    """
+    Load a chunk of images for :py:func:`load_images`.
+
+    Images are written to the memory-mapped output if `memmap_fname` is given,
+    otherwise they are returned as a stacked array.
+    """
+    if memmap_fname is not None:
+        out = np.load(memmap_fname, mmap_mode="r+")[start : start + len(fnames)]
+    else:
+        out = np.empty((len(fnames), *reference.shape), dtype=reference.dtype)
+
+    for i, fname in enumerate(fnames):
+        image = load_image(fname, **kwargs)
+        if image.shape != reference.shape:
+            raise ValueError(
+                f"Image {fname} has shape {image.shape}, expected {reference.shape} as for the "
+                "first image."
+            )
+        out[i] = image
+
+    if memmap_fname is not None:
+        out.flush()
+        return None
+    return out
+
+
 def quantize(I, nbits=8):
     """
     Quantize an image.
@@ -86,3 +211,168 @@ def quantize(I, nbits=8):
         return np.uint8(np.iinfo(np.uint8).max * I_f)
     else:
         return np.uint16(np.iinfo(np.uint16).max * I_f)
+
+
+def quantize_for_device(
+    I, device_key, stack=False, normalize="global", dither=None, out=None, chunk_nbytes=2**24
+):
+    """
+    Quantize real-valued masks to the levels a device can display.
+
+    The bit depth is taken from `slm_devices`: 1 bit for the Nokia, 5/6/5 bits
+    per RGB channel for the Adafruit (5 bits for grayscale masks) and 8 bits for
+    the Holoeye. The result is always uint8, as expected by `SLM.imshow`, with
+    each level spread over the full [0, 255] range so that its most significant
+    bits are the quantized value.
+
+    Computations are done in float32, on chunks of frames at a time, and the
+    result is written to `out` if given.
+
+    Parameters
+    ----------
+    I : :py:class:`~numpy.ndarray`
+        ([N_frame,] [3,] N_height, N_width) non-negative reals.
+    device_key : str
+        Option from `SLMDevices`.
+    stack : bool
+        Whether the first dimension of `I` indexes frames.
+    normalize : "global", "frame" or None
+        Normalize by the maximum over all of `I`, by the maximum of each frame,
+        or not at all, in which case values are expected in [0, 1].
+    dither : None, "ordered" or "error_diffusion"
+        No dithering (plain rounding, i.e. thresholding at 0.5 for 1 bit),
+        ordered dithering with an 8x8 Bayer matrix, or Floyd-Steinberg error
+        diffusion.
+    out : :py:class:`~numpy.ndarray`, optional
+        uint8 array of the same shape as `I` to write the result to.
+    chunk_nbytes : int
+        Approximate size of the float32 working buffer [bytes].
+
+    Returns
+    -------
+    out : :py:class:`~numpy.ndarray`
+        Quantized masks, same shape as `I`, uint8.
+    """
+    assert device_key in SLMDevices.values()
+    if normalize not in ("global", "frame", None):
+        raise ValueError("Parameter[normalize]: must be 'global', 'frame' or None.")
+    if dither not in (None, "ordered", "error_diffusion"):
+        raise ValueError("Parameter[dither]: must be None, 'ordered' or 'error_diffusion'.")
+
+    frames = I if stack else I[np.newaxis]
+    frame_shape = frames.shape[1:]
+    assert frame_shape[-2:] == slm_devices[device_key][SLMParam.SLM_SHAPE]
+
+    bit_depth = slm_devices[device_key][SLMParam.BIT_DEPTH]
+    if len(frame_shape) == 3:
+        bits = np.broadcast_to(bit_depth, (frame_shape[0],))
+    else:
+        bits = np.min(bit_depth)
+    levels = (2 ** np.asarray(bits, dtype=np.float32) - 1).reshape(np.shape(bits) + (1, 1))
+
+    if out is None:
+        out = np.empty(I.shape, dtype=np.uint8)
+    assert out.shape == I.shape and out.dtype == np.uint8
+    out_frames = out if stack else out[np.newaxis]
+
+    # scale from the input range to [0, levels]
+    if normalize == "global":
+        I_max = np.full(len(frames), frames.max(), dtype=np.float32)
+    elif normalize == "frame":
+        I_max = frames.reshape(len(frames), -1).max(axis=1).astype(np.float32)
+    else:
+        I_max = np.ones(len(frames), dtype=np.float32)
+    I_max[np.isclose(I_max, 0)] = 1
+    scale = (1 / I_max).reshape((-1,) + (1,) * len(frame_shape))
+
+    if dither == "ordered":
+        offset = _bayer_thresholds(frame_shape[-2:])
+    else:
+        offset = np.float32(0.5)
+
+    chunk = max(1, chunk_nbytes // (4 * int(np.prod(frame_shape))))
+    work = np.empty((min(chunk, len(frames)), *frame_shape), dtype=np.float32)
+    for start in range(0, len(frames), chunk):
+        stop = min(start + chunk, len(frames))
+        buf = work[: stop - start]
+        np.multiply(frames[start:stop], scale[start:stop], out=buf)
+        np.multiply(buf, levels, out=buf)
+
+        if dither == "error_diffusion":
+            _error_diffusion(buf, levels)
+        else:
+            np.add(buf, offset, out=buf)
+            np.floor(buf, out=buf)
+        np.clip(buf, 0, levels, out=buf)
+
+        # spread levels over [0, 255]
+        np.multiply(buf, np.float32(255) / levels, out=buf)
+        np.rint(buf, out=buf)
+        np.copyto(out_frames[start:stop], buf, casting="unsafe")
+
+    return out
+
+
+@functools.lru_cache(maxsize=None)
+def _bayer_thresholds(shape, size=8):
+    """
+    Ordered dithering thresholds in (0, 1), tiled to `shape`.
+    """
+    M = np.zeros((1, 1))
+    while M.shape[0] < size:
+        M = np.block([[4 * M, 4 * M + 2], [4 * M + 3, 4 * M + 1]])
+    M = (M + 0.5) / M.size
+
+    reps = (-(-shape[0] // size), -(-shape[1] // size))
+    thresholds = np.tile(M, reps)[: shape[0], : shape[1]].astype(np.float32)
+    thresholds.setflags(write=False)
+    return thresholds
+
+
+@functools.lru_cache(maxsize=None)
+def _wavefronts(shape):
+    """
+    Pixel indices grouped by wavefront t = 2 * row + col. Floyd-Steinberg error
+    diffusion only propagates error from one wavefront to later ones, so the
+    pixels of a wavefront can be processed together.
+    """
+    height, width = shape
+    rows, cols = np.indices(shape)
+    t = (2 * rows + cols).ravel()
+    order = np.argsort(t, kind="stable")
+    bounds = np.searchsorted(t[order], np.arange(2 * (height - 1) + width + 1))
+    rows, cols = rows.ravel()[order], cols.ravel()[order]
+
+    fronts = []
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        r, c = rows[start:stop], cols[start:stop]
+        right = c + 1 < width
+        below = r + 1 < height
+        below_left = below & (c > 0)
+        below_right = below & right
+        fronts.append((r, c, right, below, below_left, below_right))
+    return fronts
+
+
+def _error_diffusion(buf, levels):
+    """
+    In-place Floyd-Steinberg error diffusion of values in [0, levels], over the
+    last two dimensions of `buf`.
+    """
+    levels = np.asarray(levels)
+    if levels.size > 1:
+        # one channel at a time, each with its own number of levels
+        for channel in range(buf.shape[-3]):
+            _error_diffusion(buf[..., channel, :, :], levels.ravel()[channel])
+        return
+
+    levels = levels.item()
+    for r, c, right, below, below_left, below_right in _wavefronts(buf.shape[-2:]):
+        old = buf[..., r, c]
+        new = np.clip(np.floor(old + 0.5), 0, levels)
+        err = old - new
+        buf[..., r, c] = new
+        buf[..., r[right], c[right] + 1] += err[..., right] * (7 / 16)
+        buf[..., r[below_left] + 1, c[below_left] - 1] += err[..., below_left] * (3 / 16)
+        buf[..., r[below] + 1, c[below]] += err[..., below] * (5 / 16)
+        buf[..., r[below_right] + 1, c[below_right] + 1] += err[..., below_right] * (1 / 16)
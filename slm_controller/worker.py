@@ -0,0 +1,132 @@
+"""
+Background presentation worker for asynchronous display.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class PresentationWorker:
+    def __init__(self, name="slm-presentation"):
+        """
+        Thread that owns a display handle and performs the device calls
+        submitted to it.
+
+        Only the most recent pending submission is kept ("latest frame wins"):
+        submitting while another call is still waiting cancels the waiting one.
+        Frames are copied into a double buffer, so callers may reuse their array
+        as soon as `submit` returns, while the worker transfers from the other
+        buffer.
+
+        Parameters
+        ----------
+        name : str
+            Name of the worker thread.
+        """
+        self._cond = threading.Condition()
+        self._pending = None
+        self._last = None
+        self._closed = False
+
+        # back buffer is filled by `submit`, front buffer is read by the worker
+        self._back = None
+        self._front = None
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, frame=None):
+        """
+        Schedule a device call.
+
+        Parameters
+        ----------
+        fn : callable
+            Called on the worker thread, as `fn(frame)` if a frame is given and
+            `fn()` otherwise.
+        frame : :py:class:`~numpy.ndarray`, optional
+            Frame to hand over to `fn`. It is copied before `submit` returns.
+
+        Returns
+        -------
+        future : :py:class:`~concurrent.futures.Future`
+            Resolves to the `time.perf_counter` timestamp at which `fn` returned,
+            or is cancelled if superseded by a later submission.
+        """
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Cannot submit to a closed presentation worker.")
+
+            if frame is not None:
+                if (
+                    self._back is None
+                    or self._back.shape != frame.shape
+                    or self._back.dtype != frame.dtype
+                ):
+                    self._back = np.empty_like(frame)
+                np.copyto(self._back, frame)
+
+            if self._pending is not None:
+                self._pending[0].cancel()
+            self._pending = (future, fn, frame is not None)
+            self._last = future
+            self._cond.notify()
+        return future
+
+    def wait(self, timeout=None):
+        """
+        Block until the most recent submission has been performed.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Maximum time to wait [s], by default no limit.
+
+        Returns
+        -------
+        timestamp : float or None
+            `time.perf_counter` timestamp at which the call completed, None if
+            nothing was ever submitted.
+        """
+        with self._cond:
+            future = self._last
+        if future is None:
+            return None
+        return future.result(timeout)
+
+    def close(self):
+        """
+        Finish the pending submission, if any, and stop the worker thread.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                future, fn, has_frame = self._pending
+                self._pending = None
+                if has_frame:
+                    self._front, self._back = self._back, self._front
+
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                if has_frame:
+                    fn(self._front)
+                else:
+                    fn()
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(time.perf_counter())
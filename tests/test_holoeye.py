@@ -0,0 +1,114 @@
+"""
+Calls of `HoloeyeSLM` to the HOLOEYE SLM Display SDK, checked against a stand-in
+SDK recording them.
+"""
+
+import types
+
+import numpy as np
+import pytest
+
+from slm_controller.slm import HoloeyeSLM
+
+NO_ERROR = 0
+
+
+class FakeHandle:
+    def __init__(self, index):
+        self.index = index
+        self.durationInFrames = None
+
+
+class FakeSLMInstance:
+    def __init__(self, calls):
+        self.calls = calls
+        self._n_handles = 0
+
+    def requiresVersion(self, version):
+        return True
+
+    def errorString(self, error):
+        return f"error {error}".encode()
+
+    def open(self):
+        self.calls.append(("open",))
+        return NO_ERROR
+
+    def close(self):
+        self.calls.append(("close",))
+        return NO_ERROR
+
+    def loadData(self, data):
+        handle = FakeHandle(self._n_handles)
+        self._n_handles += 1
+        self.calls.append(("loadData", handle.index, data.shape))
+        return NO_ERROR, handle
+
+    def updateDatahandle(self, handle, value):
+        self.calls.append(("updateDatahandle", handle.index, handle.durationInFrames))
+        return NO_ERROR
+
+    def showDatahandle(self, handle, flags):
+        self.calls.append(("showDatahandle", handle.index))
+        return NO_ERROR
+
+    def releaseDatahandle(self, handle):
+        self.calls.append(("releaseDatahandle", handle.index))
+        return NO_ERROR
+
+
+@pytest.fixture
+def sdk():
+    sdk = types.SimpleNamespace(calls=[])
+    sdk.SLMInstance = lambda: FakeSLMInstance(sdk.calls)
+    sdk.ErrorCode = types.SimpleNamespace(NoError=NO_ERROR)
+    sdk.ShowFlags = types.SimpleNamespace(PresentAutomatic=1, PresentFitWithBars=2)
+    sdk.ApplyDataHandleValue = types.SimpleNamespace(DurationInFrames=1)
+    return sdk
+
+
+def _masks(slm, n):
+    return [np.full(slm.shape, 50 * k, dtype=np.uint8) for k in range(n)]
+
+
+def test_sequence_calls(sdk):
+    slm = HoloeyeSLM(sdk=sdk)
+    assert sdk.calls == [("open",)]
+    del sdk.calls[:]
+
+    # durations are rounded to whole frames of the 60 Hz panel
+    indices = slm.load_sequence(_masks(slm, 2), durations=[1 / 60, 0.1])
+    assert indices == [0, 1]
+    assert sdk.calls == [
+        ("loadData", 0, slm.shape),
+        ("updateDatahandle", 0, 1),
+        ("loadData", 1, slm.shape),
+        ("updateDatahandle", 1, 6),
+    ]
+    del sdk.calls[:]
+
+    slm.show_loaded(1)
+    assert sdk.calls == [("showDatahandle", 1)]
+    del sdk.calls[:]
+
+    assert slm.play_loaded([1, 0, 1]).result() == 3
+    assert sdk.calls == [("showDatahandle", 1), ("showDatahandle", 0), ("showDatahandle", 1)]
+    del sdk.calls[:]
+
+    slm.release_sequence()
+    assert sdk.calls == [("releaseDatahandle", 0), ("releaseDatahandle", 1)]
+    del sdk.calls[:]
+
+    # nothing left to release on close
+    slm.close()
+    assert sdk.calls == [("close",)]
+
+
+def test_close_releases_sequence(sdk):
+    slm = HoloeyeSLM(sdk=sdk)
+    slm.load_sequence(_masks(slm, 2))
+    slm.play_loaded().result()
+    del sdk.calls[:]
+
+    slm.close()
+    assert sdk.calls == [("releaseDatahandle", 0), ("releaseDatahandle", 1), ("close",)]
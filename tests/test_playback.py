@@ -0,0 +1,40 @@
+"""
+Timing statistics of `playback`.
+"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from slm_controller.playback import BitPlaneStats
+
+
+def _brute_force_error(stats):
+    # largest error over all gray levels, each shown as the sum of its planes
+    levels = 2**stats.n_bits - 1
+    errors = []
+    for bits in itertools.product([0, 1], repeat=stats.n_bits):
+        target = sum(b * 2**k for k, b in enumerate(bits))
+        shown = levels * sum(b * f for b, f in zip(bits, stats.fractions))
+        errors.append(abs(shown - target))
+    return max(errors)
+
+
+def test_max_level_error_ideal():
+    stats = BitPlaneStats(n_bits=3, on_times=[1.0, 2.0, 4.0])
+    assert stats.max_level_error == pytest.approx(0.0)
+
+
+def test_max_level_error_known_fractions():
+    # planes shown equally long: levels 1 and 2 are both shown as 1.5
+    stats = BitPlaneStats(n_bits=2, on_times=[0.5, 0.5])
+    assert stats.max_level_error == pytest.approx(0.5)
+
+
+def test_max_level_error_worst_level():
+    rng = np.random.default_rng(0)
+    for n_bits in range(1, 6):
+        on_times = list(2.0 ** np.arange(n_bits) * rng.uniform(0.8, 1.2, n_bits))
+        stats = BitPlaneStats(n_bits=n_bits, on_times=on_times)
+        assert stats.max_level_error == pytest.approx(_brute_force_error(stats))